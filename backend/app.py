@@ -2,24 +2,50 @@
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
+import atexit
 from datetime import datetime
 
 # Import route modules
-from routes.audio import audio_bp
+from routes.audio import audio_bp, metadata_writer
 from routes.feedback import feedback_bp
 from routes.prediction import prediction_bp
+from routes.batch import batch_bp, shutdown_batch_executor
+from utils.batching import shutdown_streamers
+from utils.inference_pool import shutdown_inference_pool
+from utils.cache import cache
+
+try:
+    from utils.json_provider import OrjsonProvider
+except ImportError:
+    OrjsonProvider = None  # orjson not installed, keep Flask's default encoder
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
+# Serialize JSON responses with orjson when available
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app)
+
+# Short-lived caching of read-heavy endpoints
+cache.init_app(app)
+
 # Register blueprints
 app.register_blueprint(audio_bp, url_prefix='/api/audio')
+app.register_blueprint(batch_bp, url_prefix='/api/audio/batch')
 app.register_blueprint(feedback_bp, url_prefix='/api/feedback')
 app.register_blueprint(prediction_bp, url_prefix='/api/prediction')
 
+# Stop inference batching and feature extraction workers on shutdown
+atexit.register(shutdown_streamers)
+atexit.register(shutdown_inference_pool)
+atexit.register(shutdown_batch_executor)
+
+# Give queued database writes a chance to finish on shutdown
+atexit.register(metadata_writer.flush)
+
 # Configuration
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024  # 200MB max upload, streamed to disk
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
 # Create upload folder if it doesn't exist
@@ -46,6 +72,9 @@ def api_status():
         'message': 'EcoSound Analyzer API is running',
         'endpoints': {
             'audio_classification': '/api/audio/classify',
+            'audio_batch_classification': '/api/audio/classify_batch',
+            'audio_raw_classification': '/api/audio/classify_raw',
+            'batch_classification': '/api/audio/batch',
             'feedback_submission': '/api/feedback/submit',
             'noise_prediction': '/api/prediction/forecast'
         }
@@ -54,7 +83,8 @@ def api_status():
 @app.errorhandler(413)
 def too_large(e):
     """Handle file too large error"""
-    return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
+    max_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'error': f'File too large. Maximum size is {max_mb}MB.'}), 413
 
 @app.errorhandler(404)
 def not_found(e):
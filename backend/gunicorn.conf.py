@@ -0,0 +1,11 @@
+# Gunicorn configuration for EcoSound Analyzer
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Load the app (and ML models) once before forking workers
+preload_app = True
+
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 120
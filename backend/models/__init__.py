@@ -10,5 +10,6 @@ This module contains the ML models used for:
 
 from .classifier import AudioClassifier
 from .anomaly_detector import AnomalyDetector
+from .registry import get_classifier, get_anomaly_detector
 
-__all__ = ['AudioClassifier', 'AnomalyDetector']
\ No newline at end of file
+__all__ = ['AudioClassifier', 'AnomalyDetector', 'get_classifier', 'get_anomaly_detector']
\ No newline at end of file
@@ -1,10 +1,119 @@
 # Anomaly Detection for Audio Noise Analysis
 import numpy as np
+from sklearn.base import clone
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-from datetime import datetime, timedelta
+from types import MappingProxyType
+from collections import OrderedDict
+from multiprocessing import shared_memory
+import multiprocessing
+import threading
+import tempfile
+import atexit
 import joblib
 import os
+import time
+from utils.jit import njit
+from .forest_scoring import build_fast_scorer
+from utils.timestamps import fast_iso_now
+from utils.model_cache import memory, array_digest, trim_cache
+
+# Numeric features extracted from each frame dictionary, in column order
+FEATURE_KEYS = ('energy', 'zcr', 'spectral_centroid', 'spectral_rolloff', 'mfcc_0', 'mfcc_1', 'mfcc_2')
+
+# Anomaly types returned by the rule-based classifier, indexed by type code
+ANOMALY_TYPES = (
+    'unknown',
+    'high_energy_event',  # Sirens, alarms, explosions
+    'loud_machinery',     # Construction, industrial
+    'unusual_quiet',      # Abnormally quiet period
+    'unusual_frequency',  # Unusual spectral content
+    'acoustic_anomaly'
+)
+
+# Human-readable descriptions for each anomaly type
+_ANOMALY_DESCRIPTIONS = MappingProxyType({
+    'high_energy_event': 'Extremely loud sound detected (possible emergency vehicle, alarm, or explosion)',
+    'loud_machinery': 'Unusually loud mechanical noise (construction equipment, industrial machinery)',
+    'unusual_quiet': 'Abnormally quiet period detected (possible sensor malfunction or unusual conditions)',
+    'unusual_frequency': 'Unusual frequency content detected (possible interference or unique sound source)',
+    'acoustic_anomaly': 'Unusual acoustic pattern detected',
+    'unknown': 'Anomaly detected but type could not be determined'
+})
+
+@njit(cache=True, fastmath=True)
+def _energy_score_nb(feature_row):
+    """Energy-based anomaly score on the first feature (assumed to be energy)"""
+    if feature_row.shape[0] == 0:
+        return 0.0
+    
+    energy = abs(feature_row[0])
+    
+    # High energy anomaly
+    if energy > 0.8:
+        return min(1.0, energy)
+    
+    # Very low energy anomaly
+    if energy < 0.05:
+        return 0.3
+    
+    return 0.0
+
+@njit(cache=True, fastmath=True)
+def _classify_type_nb(feature_row):
+    """Rule-based anomaly type code, see ANOMALY_TYPES"""
+    if feature_row.shape[0] == 0:
+        return 0
+    
+    energy = abs(feature_row[0])
+    
+    if energy > 0.9:
+        return 1
+    elif energy > 0.7:
+        return 2
+    elif energy < 0.1:
+        return 3
+    elif feature_row.shape[0] > 1:
+        # Check spectral characteristics if available
+        if abs(feature_row[1]) > 0.8:
+            return 4
+    
+    return 5
+
+# Compile the kernels at import instead of on the first request
+_energy_score_nb(np.zeros(7, dtype=np.float32))
+_classify_type_nb(np.zeros(7, dtype=np.float32))
+
+@memory.cache(ignore=['X'])
+def _fit_anomaly_pipeline(data_hash, estimator, X):
+    """Fit a scaler and a clone of estimator on X, cached on disk by data hash"""
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    
+    model = clone(estimator)
+    model.fit(np.ascontiguousarray(X_scaled, dtype=np.float32))
+    return scaler, model
+
+# Batches at least this large are scored with a threaded joblib backend
+PARALLEL_SCORING_MIN_ROWS = 256
+
+# Slots of the history state array (kept in shared memory when enabled);
+# _RETRAINING holds the pid running a retrain and _RETRAIN_STARTED its start time
+_HEAD, _COUNT, _SINCE_RETRAIN, _GENERATION, _RETRAINING, _RETRAIN_STARTED = range(6)
+_STATE_SLOTS = 6
+
+# A retrain flag older than this is treated as left behind by a killed worker
+RETRAIN_TIMEOUT_SECONDS = 600
+
+def _process_alive(pid):
+    """Whether a process with this pid still exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists but belongs to another user
+    return True
 
 class AnomalyDetector:
     """Detect unusual noise patterns and acoustic anomalies"""
@@ -12,17 +121,83 @@ class AnomalyDetector:
     def __init__(self, model_path='../models/anomaly_detector.pkl'):
         self.model_path = model_path
         self.model = None
+        self.fast_predictor = None  # Faster decision_function for the fitted forest
         self.scaler = StandardScaler()
         self.threshold = 0.1  # Anomaly threshold
-        self.feature_history = []
         self.max_history = 1000  # Maximum stored feature vectors
+        self.retrain_interval = 200  # New samples between background retrains
+        self._model_lock = threading.Lock()    # Guards swapping model and scaler
+        self._history_lock = threading.Lock()  # Guards history writes and state
+        self._model_generation = 0  # Retrain generation the current model comes from
+        self.model_version = 0  # Bumped on every model swap, part of score cache keys
+        self.score_cache_size = 2048
+        self._score_cache = OrderedDict()  # LRU of (model_version, quantized row) -> score
+        self._score_cache_lock = threading.Lock()
+        self._shared_blocks = []
+        self._shared_model_path = None
+        self._shared_owner_pid = None
+        self._reset_history()
         self.load_model()
     
+    @property
+    def history_count(self):
+        """Number of feature vectors currently stored"""
+        return int(self._history_state[_COUNT])
+    
+    @property
+    def samples_since_retrain(self):
+        """Feature vectors recorded since the last retrain started"""
+        return int(self._history_state[_SINCE_RETRAIN])
+    
+    def enable_shared_history(self, width=len(FEATURE_KEYS)):
+        """
+        Move the feature history into shared memory so forked workers share it
+        
+        Call once in the parent process before forking (e.g. gunicorn --preload).
+        All workers then record into one ring buffer of fixed width, only one of
+        them retrains at a time, and the others load the model it publishes.
+        """
+        if self._shared_blocks:
+            return
+        
+        def shared_array(shape, dtype):
+            block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            self._shared_blocks.append(block)
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            array[:] = 0
+            return array
+        
+        self.history = shared_array((self.max_history, width), np.float32)
+        self._history_state = shared_array((_STATE_SLOTS,), np.int64)
+        self._history_lock = multiprocessing.Lock()
+        
+        self._shared_owner_pid = os.getpid()
+        self._shared_model_path = os.path.join(
+            tempfile.gettempdir(), f'ecosound_anomaly_{self._shared_owner_pid}.pkl'
+        )
+        atexit.register(self._release_shared_history)
+        print(f"Sharing anomaly feature history across workers (width {width})")
+    
+    def _release_shared_history(self):
+        """Free the shared memory blocks; only the creating process unlinks them"""
+        is_owner = os.getpid() == self._shared_owner_pid
+        for block in self._shared_blocks:
+            try:
+                block.close()
+                if is_owner:
+                    block.unlink()
+            except Exception:
+                pass
+        
+        if is_owner and self._shared_model_path and os.path.exists(self._shared_model_path):
+            os.remove(self._shared_model_path)
+    
     def load_model(self):
         """Load pre-trained anomaly detection model"""
         try:
             if os.path.exists(self.model_path):
                 self.model = joblib.load(self.model_path)
+                self.fast_predictor = build_fast_scorer(self.model)
                 print(f"Loaded anomaly detector from {self.model_path}")
             else:
                 print("Anomaly model not found, creating new model")
@@ -36,76 +211,104 @@ class AnomalyDetector:
         return IsolationForest(
             contamination=0.1,  # Expected proportion of anomalies
             random_state=42,
-            n_estimators=100
+            n_estimators=100,
+            max_features=1.0,  # Use every feature so per-tree column indexing is skipped
+            bootstrap=False,
+            n_jobs=-1
         )
     
     def detect(self, features):
         """Detect anomalies in audio features"""
+        return self.detect_many([features])[0]
+    
+    def detect_many(self, features_batch):
+        """Detect anomalies for several feature sets, scoring them in one model call"""
         try:
-            if not features:
-                return self._no_anomaly_result()
-            
-            # Convert features to numpy array
-            feature_array = self._prepare_features(features)
+            # Convert features to numpy arrays
+            feature_arrays = [
+                self._prepare_features(features) if features is not None and len(features) > 0 else None
+                for features in features_batch
+            ]
             
-            if feature_array is None:
-                return self._no_anomaly_result()
+            # Pick up a model retrained by another worker
+            self._sync_shared_model()
             
             # Update feature history for model training
-            self._update_feature_history(feature_array)
+            for feature_array in feature_arrays:
+                self._update_feature_history(feature_array)
+            
+            # Retrain model in the background once enough new data has accumulated
+            self._schedule_retrain()
             
-            # Retrain model if we have enough data
-            if len(self.feature_history) >= 50:
-                self._retrain_model()
+            results = [self._no_anomaly_result() for _ in features_batch]
+            scored = [(i, a) for i, a in enumerate(feature_arrays) if a is not None]
+            if not scored:
+                return results
             
             # Detect anomalies
-            anomaly_score = self._calculate_anomaly_score(feature_array)
+            anomaly_scores = self._calculate_anomaly_scores([a for _, a in scored])
             
             # Classify anomaly type if detected
-            if anomaly_score > self.threshold:
-                anomaly_type = self._classify_anomaly_type(feature_array)
-                return {
-                    'detected': True,
-                    'type': anomaly_type,
-                    'severity': self._get_anomaly_severity(anomaly_score),
-                    'confidence': min(1.0, anomaly_score * 2),
-                    'score': float(anomaly_score),
-                    'timestamp': datetime.now().isoformat(),
-                    'description': self._get_anomaly_description(anomaly_type)
-                }
-            else:
-                return self._no_anomaly_result()
+            for (i, feature_array), anomaly_score in zip(scored, anomaly_scores):
+                if anomaly_score > self.threshold:
+                    anomaly_type = self._classify_anomaly_type(feature_array)
+                    results[i] = {
+                        'detected': True,
+                        'type': anomaly_type,
+                        'severity': self._get_anomaly_severity(anomaly_score),
+                        'confidence': min(1.0, anomaly_score * 2),
+                        'score': float(anomaly_score),
+                        'timestamp': fast_iso_now(),
+                        'description': self._get_anomaly_description(anomaly_type)
+                    }
+            
+            return results
                 
         except Exception as e:
             print(f"Anomaly detection error: {e}")
-            return self._no_anomaly_result()
+            return [self._no_anomaly_result() for _ in features_batch]
+    
+    def _reset_history(self):
+        """Allocate an empty feature history ring buffer"""
+        if self._shared_blocks:
+            # Clear the shared buffers in place so every worker sees the reset
+            with self._history_lock:
+                self.history[:] = 0
+                self._history_state[:] = 0
+            return
+        
+        self.history = None  # (max_history, width) array, allocated on first sample
+        self._history_state = np.zeros(_STATE_SLOTS, dtype=np.int64)
     
     def _prepare_features(self, features):
         """Prepare features for anomaly detection"""
         try:
+            if isinstance(features, np.ndarray):
+                # Columnar (N, 7) frames decoded at ingress: flatten without copying
+                return np.asarray(features, dtype=np.float32).reshape(1, -1)
+            
             if isinstance(features, list) and len(features) > 0:
-                if isinstance(features[0], dict):
-                    # Extract numeric features from dictionaries
-                    feature_vector = []
-                    for feature in features:
-                        if isinstance(feature, dict):
-                            # Extract energy, zcr, and other numeric features
-                            feature_vector.extend([
-                                feature.get('energy', 0),
-                                feature.get('zcr', 0),
-                                feature.get('spectral_centroid', 0),
-                                feature.get('spectral_rolloff', 0),
-                                feature.get('mfcc_0', 0),
-                                feature.get('mfcc_1', 0),
-                                feature.get('mfcc_2', 0)
-                            ])
+                if isinstance(features[0], (list, tuple)):
+                    # Rows of FEATURE_KEYS values, one per frame
+                    return np.asarray(features, dtype=np.float32).reshape(1, -1)
+                
+                elif isinstance(features[0], dict):
+                    # Legacy format: extract numeric features from dictionaries
+                    frames = [feature for feature in features if isinstance(feature, dict)]
+                    n_keys = len(FEATURE_KEYS)
+                    feature_array = np.empty((1, len(frames) * n_keys), dtype=np.float32)
                     
-                    if feature_vector:
-                        return np.array(feature_vector).reshape(1, -1)
+                    for row, feature in enumerate(frames):
+                        # Extract energy, zcr, and other numeric features
+                        offset = row * n_keys
+                        for col, key in enumerate(FEATURE_KEYS):
+                            feature_array[0, offset + col] = feature.get(key, 0)
+                    
+                    return feature_array
                 
                 elif isinstance(features[0], (int, float)):
                     # Direct numeric features
-                    return np.array(features).reshape(1, -1)
+                    return np.asarray(features, dtype=np.float32).reshape(1, -1)
             
             return None
             
@@ -116,114 +319,227 @@ class AnomalyDetector:
     def _update_feature_history(self, feature_array):
         """Update feature history for model training"""
         if feature_array is not None:
-            self.feature_history.append(feature_array.flatten())
+            row = feature_array[0]
             
-            # Maintain maximum history size
-            if len(self.feature_history) > self.max_history:
-                self.feature_history.pop(0)
+            with self._history_lock:
+                if self.history is None:
+                    self.history = np.zeros((self.max_history, len(row)), dtype=np.float32)
+                
+                # Overwrite the oldest slot once the buffer is full; rows are zero-padded
+                # or truncated to the buffer width so every stored row is equal-width
+                state = self._history_state
+                head = state[_HEAD]
+                width = min(len(row), self.history.shape[1])
+                self.history[head, :width] = row[:width]
+                self.history[head, width:] = 0
+                
+                state[_HEAD] = (head + 1) % self.max_history
+                state[_COUNT] = min(state[_COUNT] + 1, self.max_history)
+                state[_SINCE_RETRAIN] += 1
     
-    def _retrain_model(self):
-        """Retrain anomaly detection model with accumulated data"""
+    def _retrain_running(self):
+        """Whether a live, recent retrain holds the flag; call with _history_lock held"""
+        state = self._history_state
+        pid = int(state[_RETRAINING])
+        if not pid:
+            return False
+        
+        # A worker killed mid-fit never clears its flag, so expire it
+        if not _process_alive(pid) or time.time() - state[_RETRAIN_STARTED] > RETRAIN_TIMEOUT_SECONDS:
+            print(f"Clearing stale anomaly retrain flag left by process {pid}")
+            state[_RETRAINING] = 0
+            return False
+        return True
+    
+    def _release_retrain_flag(self):
+        """Clear the retrain flag if this process still holds it"""
+        with self._history_lock:
+            if self._history_state[_RETRAINING] == os.getpid():
+                self._history_state[_RETRAINING] = 0
+    
+    def _schedule_retrain(self):
+        """Start a background retrain once enough new data has accumulated"""
         try:
-            if len(self.feature_history) >= 50:
-                X = np.array(self.feature_history)
-                
-                # Ensure consistent feature dimensions
-                min_features = min(len(x) for x in self.feature_history)
-                X = np.array([x[:min_features] for x in self.feature_history])
+            with self._history_lock:
+                state = self._history_state
                 
-                # Scale features
-                X_scaled = self.scaler.fit_transform(X)
+                # At most one retrain at a time, across all workers when shared
+                if state[_COUNT] < 50 or self._retrain_running():
+                    return
+                if state[_GENERATION] > 0 and state[_SINCE_RETRAIN] < self.retrain_interval:
+                    return
                 
-                # Retrain model
-                self.model.fit(X_scaled)
-                print(f"Retrained anomaly model with {len(X)} samples")
+                state[_RETRAINING] = os.getpid()
+                state[_RETRAIN_STARTED] = int(time.time())
+                state[_SINCE_RETRAIN] = 0
                 
+                # Snapshot the history so later requests can keep writing to it
+                X = self.history[:state[_COUNT]].copy()
+            
+            thread = threading.Thread(target=self._retrain_model, args=(X,), daemon=True)
+            thread.start()
         except Exception as e:
+            self._release_retrain_flag()
             print(f"Model retraining error: {e}")
     
-    def _calculate_anomaly_score(self, feature_array):
-        """Calculate anomaly score for features"""
+    def _retrain_model(self, X):
+        """Retrain anomaly detection model with accumulated data"""
+        generation = None
         try:
-            if self.model is None or feature_array is None:
-                return 0.0
+            # Fit a fresh scaler and model so scoring keeps using the old pair meanwhile,
+            # reusing the cached fit when the same history was seen before
+            scaler, model = _fit_anomaly_pipeline(array_digest(X), clone(self.model), X)
+            trim_cache()
             
-            # Ensure feature array has correct dimensions
-            if len(self.feature_history) > 0:
-                expected_features = len(self.feature_history[0])
-                if feature_array.shape[1] != expected_features:
-                    # Pad or truncate to match expected dimensions
-                    if feature_array.shape[1] < expected_features:
-                        padding = np.zeros((1, expected_features - feature_array.shape[1]))
-                        feature_array = np.hstack([feature_array, padding])
-                    else:
-                        feature_array = feature_array[:, :expected_features]
+            # Publish the retrained model for the other workers
+            if self._shared_model_path:
+                temp_path = f'{self._shared_model_path}.{os.getpid()}.tmp'
+                joblib.dump((model, scaler), temp_path)
+                os.replace(temp_path, self._shared_model_path)
             
-            # Scale features if scaler is fitted
-            if hasattr(self.scaler, 'mean_'):
-                try:
-                    feature_array = self.scaler.transform(feature_array)
-                except:
-                    pass  # Skip scaling if it fails
+            with self._history_lock:
+                self._history_state[_GENERATION] += 1
+                generation = int(self._history_state[_GENERATION])
             
-            # Get anomaly score
-            if hasattr(self.model, 'decision_function'):
-                score = self.model.decision_function(feature_array)[0]
-                # Convert to 0-1 range where higher is more anomalous
-                return max(0, -score / 2)
-            elif hasattr(self.model, 'score_samples'):
-                score = self.model.score_samples(feature_array)[0]
-                return max(0, -score)
+            self._install_model(model, scaler, generation)
+            print(f"Retrained anomaly model with {len(X)} samples")
+            
+        except Exception as e:
+            print(f"Model retraining error: {e}")
+        finally:
+            self._release_retrain_flag()
+    
+    def _install_model(self, model, scaler, generation):
+        """Swap in a fitted model and scaler"""
+        fast_predictor = build_fast_scorer(model)
+        
+        with self._model_lock:
+            self.model = model
+            self.fast_predictor = fast_predictor
+            self.scaler = scaler
+            self.model_version += 1
+            self._model_generation = generation
+        self._clear_score_cache()
+    
+    def _sync_shared_model(self):
+        """Load the model published by another worker if it is newer than ours"""
+        if not self._shared_model_path:
+            return
+        
+        generation = int(self._history_state[_GENERATION])
+        if generation <= self._model_generation:
+            return
+        
+        try:
+            model, scaler = joblib.load(self._shared_model_path)
+            self._install_model(model, scaler, generation)
+        except Exception as e:
+            print(f"Error loading shared anomaly model: {e}")
+    
+    def _calculate_anomaly_scores(self, feature_arrays):
+        """Calculate anomaly scores for a list of (1, n) feature arrays"""
+        try:
+            # Score against a consistent model/scaler pair
+            with self._model_lock:
+                model = self.model
+                fast_predictor = self.fast_predictor
+                scaler = self.scaler
+                model_version = self.model_version
+            
+            if model is None or not feature_arrays:
+                return [0.0] * len(feature_arrays)
+            
+            # Copy every feature array into one zero-initialized matrix of the width
+            # the model was trained on, padding or truncating as needed
+            if self.history is not None:
+                expected_features = self.history.shape[1]
             else:
-                # Fallback: use simple energy-based detection
-                return self._energy_based_anomaly_score(feature_array)
+                expected_features = feature_arrays[0].shape[1]
+            
+            feature_matrix = np.zeros((len(feature_arrays), expected_features), dtype=np.float32)
+            for i, feature_array in enumerate(feature_arrays):
+                width = min(feature_array.shape[1], expected_features)
+                feature_matrix[i, :width] = feature_array[0, :width]
+            
+            # Reuse scores of recently seen (quantized) feature vectors
+            keys = [self._score_cache_key(model_version, row) for row in feature_matrix]
+            with self._score_cache_lock:
+                scores = [self._score_cache.get(key) for key in keys]
+                for key, score in zip(keys, scores):
+                    if score is not None:
+                        self._score_cache.move_to_end(key)
+            
+            missing = [i for i, score in enumerate(scores) if score is None]
+            if missing:
+                new_scores = self._score_matrix(model, fast_predictor, scaler, feature_matrix[missing])
+                with self._score_cache_lock:
+                    for i, score in zip(missing, new_scores):
+                        scores[i] = score
+                        self._score_cache[keys[i]] = score
+                    while len(self._score_cache) > self.score_cache_size:
+                        self._score_cache.popitem(last=False)
+            
+            return scores
                 
         except Exception as e:
             print(f"Anomaly scoring error: {e}")
-            return 0.0
+            return [0.0] * len(feature_arrays)
+    
+    def _score_cache_key(self, model_version, feature_row):
+        """Cache key from the model version and the feature row quantized to 1/256"""
+        return model_version, np.round(feature_row * 256).astype(np.int64).tobytes()
+    
+    def _score_matrix(self, model, fast_predictor, scaler, feature_matrix):
+        """Score every row of a feature matrix with one model call"""
+        # Scale features if the scaler is fitted for this feature width
+        if hasattr(scaler, 'mean_') and scaler.mean_.shape[0] == feature_matrix.shape[1]:
+            feature_matrix = scaler.transform(feature_matrix)
+        
+        # Get anomaly scores
+        if fast_predictor is not None:
+            # Treelite or cached path lengths, bypassing sklearn's decision_function
+            scores = fast_predictor.decision_function(feature_matrix)
+            return [max(0, -score / 2) for score in scores]
+        elif hasattr(model, 'decision_function'):
+            if len(feature_matrix) >= PARALLEL_SCORING_MIN_ROWS:
+                # Spread large batches over the trees with threads
+                with joblib.parallel_backend('threading', n_jobs=os.cpu_count()):
+                    scores = model.decision_function(feature_matrix)
+            else:
+                scores = model.decision_function(feature_matrix)
+            # Convert to 0-1 range where higher is more anomalous
+            return [max(0, -score / 2) for score in scores]
+        elif hasattr(model, 'score_samples'):
+            scores = model.score_samples(feature_matrix)
+            return [max(0, -score) for score in scores]
+        else:
+            # Fallback: use simple energy-based detection
+            return [
+                self._energy_based_anomaly_score(feature_matrix[i:i + 1])
+                for i in range(len(feature_matrix))
+            ]
+    
+    def _clear_score_cache(self):
+        """Drop cached scores computed with a previous model"""
+        with self._score_cache_lock:
+            self._score_cache.clear()
     
     def _energy_based_anomaly_score(self, feature_array):
         """Fallback energy-based anomaly detection"""
         try:
-            # Simple threshold-based detection on first feature (assumed to be energy)
-            if feature_array.shape[1] > 0:
-                energy = abs(feature_array[0, 0])
-                
-                # High energy anomaly
-                if energy > 0.8:
-                    return min(1.0, energy)
-                
-                # Very low energy anomaly
-                if energy < 0.05:
-                    return 0.3
-            
-            return 0.0
-            
+            return float(_energy_score_nb(np.asarray(feature_array[0], dtype=np.float32)))
         except:
             return 0.0
     
     def _classify_anomaly_type(self, feature_array):
         """Classify the type of anomaly detected"""
         try:
-            if feature_array is None or feature_array.shape[1] == 0:
+            if feature_array is None:
                 return 'unknown'
             
             # Simple rule-based classification
-            energy = abs(feature_array[0, 0]) if feature_array.shape[1] > 0 else 0
-            
-            if energy > 0.9:
-                return 'high_energy_event'  # Sirens, alarms, explosions
-            elif energy > 0.7:
-                return 'loud_machinery'     # Construction, industrial
-            elif energy < 0.1:
-                return 'unusual_quiet'      # Abnormally quiet period
-            elif feature_array.shape[1] > 1:
-                # Check spectral characteristics if available
-                spectral_feature = abs(feature_array[0, 1])
-                if spectral_feature > 0.8:
-                    return 'unusual_frequency'  # Unusual spectral content
-            
-            return 'acoustic_anomaly'
+            type_code = _classify_type_nb(np.asarray(feature_array[0], dtype=np.float32))
+            return ANOMALY_TYPES[type_code]
             
         except Exception as e:
             print(f"Anomaly classification error: {e}")
@@ -242,15 +558,7 @@ class AnomalyDetector:
     
     def _get_anomaly_description(self, anomaly_type):
         """Get human-readable description of anomaly"""
-        descriptions = {
-            'high_energy_event': 'Extremely loud sound detected (possible emergency vehicle, alarm, or explosion)',
-            'loud_machinery': 'Unusually loud mechanical noise (construction equipment, industrial machinery)',
-            'unusual_quiet': 'Abnormally quiet period detected (possible sensor malfunction or unusual conditions)',
-            'unusual_frequency': 'Unusual frequency content detected (possible interference or unique sound source)',
-            'acoustic_anomaly': 'Unusual acoustic pattern detected',
-            'unknown': 'Anomaly detected but type could not be determined'
-        }
-        return descriptions.get(anomaly_type, 'Unusual noise pattern detected')
+        return _ANOMALY_DESCRIPTIONS.get(anomaly_type, 'Unusual noise pattern detected')
     
     def _no_anomaly_result(self):
         """Return result indicating no anomaly detected"""
@@ -260,7 +568,7 @@ class AnomalyDetector:
             'severity': 'none',
             'confidence': 0.0,
             'score': 0.0,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': fast_iso_now(),
             'description': 'No anomaly detected'
         }
     
@@ -268,7 +576,7 @@ class AnomalyDetector:
         """Get statistics about detected anomalies"""
         return {
             'model_type': type(self.model).__name__,
-            'feature_history_size': len(self.feature_history),
+            'feature_history_size': self.history_count,
             'threshold': self.threshold,
             'model_trained': hasattr(self.scaler, 'mean_'),
             'detection_ready': self.model is not None
@@ -294,7 +602,12 @@ class AnomalyDetector:
     
     def reset_model(self):
         """Reset the anomaly detection model"""
-        self.model = self._create_anomaly_model()
-        self.scaler = StandardScaler()
-        self.feature_history = []
+        with self._model_lock:
+            self.model = self._create_anomaly_model()
+            self.fast_predictor = None
+            self.scaler = StandardScaler()
+            self.model_version += 1
+            self._model_generation = 0
+        self._clear_score_cache()
+        self._reset_history()
         print("Anomaly detection model reset")
\ No newline at end of file
@@ -3,24 +3,49 @@ import numpy as np
 import joblib
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
-import tensorflow as tf
-from tensorflow import keras
 import os
+import threading
+from types import MappingProxyType
+from utils.model_cache import memory, array_digest, trim_cache
+
+# Source type category for each class label
+_SOURCE_MAP = MappingProxyType({
+    'Traffic': 'vehicular',
+    'Construction': 'industrial',
+    'Industrial': 'industrial',
+    'Human': 'social',
+    'Nature': 'environmental',
+    'Other': 'mixed'
+})
+
+@memory.cache(ignore=['X', 'y'])
+def _fit_fallback_classifier(data_hash, X, y):
+    """Fit the fallback scaler and random forest, cached on disk by data hash"""
+    scaler = StandardScaler()
+    model = RandomForestClassifier(n_estimators=50, random_state=42)
+    model.fit(scaler.fit_transform(X), y)
+    return scaler, model
 
 class AudioClassifier:
     """ML-powered audio classification for noise source identification"""
     
     def __init__(self, model_path='../models/yamnet.h5'):
         self.model_path = model_path
+        self.scaler_path = os.path.join(os.path.dirname(model_path), 'scaler.pkl')
         self.model = None
         self.scaler = StandardScaler()
         self.class_labels = ['Traffic', 'Construction', 'Nature', 'Human', 'Industrial', 'Other']
+        self._scratch = threading.local()  # Per-thread (1, 13) input row for quick_classify
         self.load_model()
+        self.load_scaler()
         
     def load_model(self):
         """Load pre-trained model"""
         try:
             if os.path.exists(self.model_path):
+                # Import TensorFlow only when there is a Keras model to load
+                os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+                from tensorflow import keras
                 self.model = keras.models.load_model(self.model_path)
                 print(f"Loaded model from {self.model_path}")
             else:
@@ -30,77 +55,170 @@ class AudioClassifier:
             print(f"Error loading model: {e}, using fallback")
             self.model = self._create_fallback_model()
     
+    def load_scaler(self):
+        """Load the feature scaler saved with the trained model"""
+        if hasattr(self.scaler, 'mean_'):
+            return  # Already fitted alongside the fallback model
+        
+        # A trained model is only meaningful with the normalisation it was trained
+        # with; refusing to start beats serving predictions from an invented one
+        try:
+            self.scaler = joblib.load(self.scaler_path)
+        except Exception as e:
+            raise RuntimeError(
+                f"Trained model {self.model_path} has no usable feature scaler at {self.scaler_path}: {e}"
+            ) from e
+        print(f"Loaded feature scaler from {self.scaler_path}")
+    
+    def save_scaler(self, path=None):
+        """Save the fitted feature scaler next to the model, for use by training scripts"""
+        try:
+            save_path = path or self.scaler_path
+            joblib.dump(self.scaler, save_path)
+            print(f"Saved feature scaler to {save_path}")
+        except Exception as e:
+            print(f"Error saving feature scaler: {e}")
+    
     def _create_fallback_model(self):
         """Create simple fallback model for demo purposes"""
-        model = RandomForestClassifier(n_estimators=50, random_state=42)
-        # Train with some mock data for demo
-        X_mock = np.random.rand(100, 13)  # 13 MFCC features
-        y_mock = np.random.randint(0, len(self.class_labels), 100)
-        model.fit(X_mock, y_mock)
+        # Train with some mock data for demo (seeded so the cached fit is reused)
+        rng = np.random.default_rng(42)
+        X_mock = rng.random((100, 13), dtype=np.float32)  # 13 MFCC features
+        y_mock = rng.integers(0, len(self.class_labels), 100)
+        # Fit the scaler on the same training set the model sees
+        self.scaler, model = _fit_fallback_classifier(array_digest(X_mock, y_mock), X_mock, y_mock)
+        trim_cache()
         return model
     
     def classify(self, features):
         """Classify audio features into noise source categories"""
-        try:
-            if isinstance(features, list) and len(features) > 0:
-                # Convert MFCC features to numpy array
-                feature_array = np.array(features)
-                
-                if len(feature_array.shape) == 1:
-                    feature_array = feature_array.reshape(1, -1)
-                
-                # Ensure we have the right number of features
-                if feature_array.shape[1] < 13:
-                    # Pad with zeros if not enough features
-                    padding = np.zeros((feature_array.shape[0], 13 - feature_array.shape[1]))
-                    feature_array = np.hstack([feature_array, padding])
-                elif feature_array.shape[1] > 13:
-                    # Truncate if too many features
-                    feature_array = feature_array[:, :13]
-                
-                # Normalize features
-                feature_array = self.scaler.fit_transform(feature_array)
-                
-                # Get predictions
-                if hasattr(self.model, 'predict_proba'):
-                    # Sklearn model
-                    probabilities = self.model.predict_proba(feature_array)[0]
-                else:
-                    # TensorFlow model
-                    probabilities = self.model.predict(feature_array)[0]
-                
-                # Create results
-                results = []
-                for i, prob in enumerate(probabilities):
-                    results.append({
-                        'class': self.class_labels[i],
-                        'confidence': float(prob),
-                        'source_type': self._get_source_type(self.class_labels[i])
-                    })
-                
-                # Sort by confidence
-                results.sort(key=lambda x: x['confidence'], reverse=True)
-                return results
-                
-            else:
-                # Fallback classification
-                return self._generate_mock_classification()
+        return self.classify_many([features])[0]
+    
+    def classify_many(self, features_batch):
+        """Classify several feature sets with a single model call"""
+        results = [None] * len(features_batch)
+        rows = []
+        row_indices = []
+        
+        for i, features in enumerate(features_batch):
+            try:
+                row = self._prepare_feature_row(features)
+            except Exception as e:
+                print(f"Classification error: {e}")
+                row = None
+            
+            if row is not None:
+                rows.append(row)
+                row_indices.append(i)
+        
+        if rows:
+            try:
+                # Copy each row into one zero-initialized (N, 13) buffer, which also pads
+                feature_matrix = np.zeros((len(rows), 13), dtype=np.float32)
+                for j, row in enumerate(rows):
+                    feature_matrix[j, :len(row)] = row
                 
-        except Exception as e:
-            print(f"Classification error: {e}")
-            return self._generate_mock_classification()
+                probabilities = self.classify_batch(feature_matrix)
+                for i, probs in zip(row_indices, probabilities):
+                    results[i] = self.format_results(probs)
+            except Exception as e:
+                print(f"Classification error: {e}")
+        
+        # Fallback classification for anything that could not be scored
+        return [
+            result if result is not None else self._generate_mock_classification()
+            for result in results
+        ]
+    
+    def classify_batch(self, feature_matrix):
+        """Classify an (N, n_features) matrix in one model call, returning N x C probabilities"""
+        feature_matrix = np.asarray(feature_matrix, dtype=np.float32)
+        
+        if len(feature_matrix.shape) == 1:
+            feature_matrix = feature_matrix.reshape(1, -1)
+        
+        # Ensure we have the right number of features
+        if feature_matrix.shape[1] < 13:
+            # Pad with zeros by copying into a pre-sized buffer
+            padded = np.zeros((feature_matrix.shape[0], 13), dtype=np.float32)
+            padded[:, :feature_matrix.shape[1]] = feature_matrix
+            feature_matrix = padded
+        elif feature_matrix.shape[1] > 13:
+            feature_matrix = feature_matrix[:, :13]
+        
+        # Normalize features with the pre-fitted scaler
+        feature_matrix = self.scaler.transform(feature_matrix)
+        
+        return np.asarray(self._predict_probabilities(feature_matrix))
+    
+    def _prepare_feature_row(self, features):
+        """Convert raw features into a single model input row of at most 13 values"""
+        if isinstance(features, np.ndarray):
+            # Columnar features decoded at ingress, used as-is
+            feature_array = features
+        elif isinstance(features, list) and len(features) > 0:
+            # Convert MFCC features to numpy array
+            feature_array = np.asarray(features, dtype=np.float32)
+        else:
+            return None
+        
+        if feature_array.size == 0:
+            return None
+        
+        if len(feature_array.shape) == 1:
+            feature_array = feature_array.reshape(1, -1)
+        
+        # Truncate if too many features; short rows are zero-padded by the caller
+        return feature_array[0, :13]
+    
+    def _predict_probabilities(self, feature_matrix):
+        """Run one model call over a stacked (N, 13) feature matrix"""
+        if hasattr(self.model, 'predict_proba'):
+            # Sklearn model
+            return self.model.predict_proba(feature_matrix)
+        # TensorFlow model
+        return self.model.predict(feature_matrix)
+    
+    def format_results(self, probabilities):
+        """Turn a probability vector into results sorted by confidence"""
+        probabilities = np.asarray(probabilities)
+        
+        # Highest confidence first, in a single pass over the sorted indices
+        return [
+            {
+                'class': self.class_labels[i],
+                'confidence': probabilities[i].item(),
+                'source_type': _SOURCE_MAP.get(self.class_labels[i], 'mixed')
+            }
+            for i in np.argsort(-probabilities, kind='stable')
+        ]
     
     def quick_classify(self, features):
         """Quick classification for real-time processing"""
-        # Simplified version for real-time use
-        results = self.classify(features)
+        try:
+            row = self._prepare_feature_row(features)
+            if row is None:
+                return self._generate_mock_classification()[:3]
+            
+            # Reuse this thread's input row instead of allocating one per frame
+            buffer = getattr(self._scratch, 'row', None)
+            if buffer is None:
+                buffer = self._scratch.row = np.empty((1, 13), dtype=np.float32)
+            buffer.fill(0)
+            np.copyto(buffer[0, :len(row)], row, casting='unsafe')
+            
+            results = self.format_results(self.classify_batch(buffer)[0])
+        except Exception as e:
+            print(f"Classification error: {e}")
+            results = self._generate_mock_classification()
+        
         # Return only top 3 results for speed
-        return results[:3] if results else []
+        return results[:3]
     
     def estimate_noise_level(self, features, classification_results):
         """Estimate noise level in dB based on features and classification"""
         try:
-            if not features or not classification_results:
+            if features is None or len(features) == 0 or not classification_results:
                 return 55.0  # Default level
             
             # Get dominant source
@@ -138,7 +256,11 @@ class AudioClassifier:
     def _calculate_energy_adjustment(self, features):
         """Calculate adjustment based on audio energy"""
         try:
-            if isinstance(features, list) and len(features) > 0:
+            if isinstance(features, np.ndarray) and features.size > 0:
+                # Columnar features: energy is the first column
+                avg_energy = np.mean(features.reshape(len(features), -1)[:, 0])
+                return (avg_energy - 0.3) * 25
+            elif isinstance(features, list) and len(features) > 0:
                 # Calculate average energy from features
                 if isinstance(features[0], dict) and 'energy' in features[0]:
                     avg_energy = np.mean([f['energy'] for f in features])
@@ -153,40 +275,13 @@ class AudioClassifier:
     
     def _get_source_type(self, class_name):
         """Get source type category"""
-        source_mapping = {
-            'Traffic': 'vehicular',
-            'Construction': 'industrial',
-            'Industrial': 'industrial',
-            'Human': 'social',
-            'Nature': 'environmental',
-            'Other': 'mixed'
-        }
-        return source_mapping.get(class_name, 'mixed')
+        return _SOURCE_MAP.get(class_name, 'mixed')
     
     def _generate_mock_classification(self):
         """Generate mock classification for demo purposes"""
-        import random
-        
-        # Generate realistic mock probabilities
-        mock_results = []
-        total_prob = 0
-        
-        for class_name in self.class_labels:
-            prob = random.uniform(0.1, 0.9)
-            mock_results.append({
-                'class': class_name,
-                'confidence': prob,
-                'source_type': self._get_source_type(class_name)
-            })
-            total_prob += prob
-        
-        # Normalize probabilities
-        for result in mock_results:
-            result['confidence'] = result['confidence'] / total_prob
-        
-        # Sort by confidence
-        mock_results.sort(key=lambda x: x['confidence'], reverse=True)
-        return mock_results
+        # Normalized mock probabilities in a single draw
+        probabilities = np.random.dirichlet(np.ones(len(self.class_labels)))
+        return self.format_results(probabilities)
     
     def calibrate_noise_levels(self, reference_measurements):
         """Calibrate noise level predictions with reference measurements"""
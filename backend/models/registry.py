@@ -0,0 +1,35 @@
+# Shared model instances
+"""
+Process-wide registry of the ML models.
+
+Every caller gets the same warm classifier and anomaly detector, so model
+weights are loaded once per process however many modules ask for them.
+Routes should take their models from here rather than constructing them.
+"""
+import threading
+from functools import lru_cache
+from .classifier import AudioClassifier
+from .anomaly_detector import AnomalyDetector
+
+_registry_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _load_classifier():
+    """Build the process-wide AudioClassifier"""
+    return AudioClassifier()
+
+@lru_cache(maxsize=1)
+def _load_anomaly_detector():
+    """Build the process-wide AnomalyDetector"""
+    return AnomalyDetector()
+
+def get_classifier():
+    """Return the shared AudioClassifier, loading it on first use"""
+    # lru_cache alone may run the loader twice under concurrent first calls
+    with _registry_lock:
+        return _load_classifier()
+
+def get_anomaly_detector():
+    """Return the shared AnomalyDetector, creating it on first use"""
+    with _registry_lock:
+        return _load_anomaly_detector()
\ No newline at end of file
@@ -4,6 +4,7 @@ API routes for EcoSound Analyzer backend
 
 This module contains all the Flask blueprints for:
 - Audio processing and classification
+- Bulk offline classification jobs
 - Citizen feedback submission
 - Noise prediction and forecasting
 """
@@ -11,5 +12,6 @@ This module contains all the Flask blueprints for:
 from .audio import audio_bp
 from .feedback import feedback_bp
 from .prediction import prediction_bp
+from .batch import batch_bp
 
-__all__ = ['audio_bp', 'feedback_bp', 'prediction_bp']
\ No newline at end of file
+__all__ = ['audio_bp', 'feedback_bp', 'prediction_bp', 'batch_bp']
\ No newline at end of file
@@ -1,24 +1,122 @@
 # Audio processing routes
 from flask import Blueprint, request, jsonify
 import os
+import base64
 import tempfile
+import shutil
+from functools import lru_cache
+import numpy as np
 from werkzeug.utils import secure_filename
-from models.classifier import AudioClassifier
-from models.anomaly_detector import AnomalyDetector
-from utils.audio_features import extract_mfcc_features
-from utils.db_handler import save_audio_metadata
+from models.anomaly_detector import FEATURE_KEYS
+from models.registry import get_classifier, get_anomaly_detector
+from utils.db_handler import save_audio_metadata, save_audio_metadata_bulk
+from utils.batching import create_streamer
+from utils.inference_pool import inference_pool
+from utils.write_queue import BackgroundWriter
+from utils.who_compliance import who_category, who_categories
 
 audio_bp = Blueprint('audio', __name__)
 
-# Initialize ML models
-classifier = AudioClassifier()
-anomaly_detector = AnomalyDetector()
+# Shared ML models, loaded once per process
+classifier = get_classifier()
+anomaly_detector = get_anomaly_detector()
 
-ALLOWED_EXTENSIONS = {'wav', 'mp3', 'm4a', 'ogg'}
+# Collect concurrent requests into micro-batches for a single model call
+classify_streamer = create_streamer(classifier.classify_many, batch_size=32, max_latency=0.05)
+anomaly_streamer = create_streamer(anomaly_detector.detect_many, batch_size=32, max_latency=0.05)
+
+# Persist recording metadata off the request thread, a burst at a time
+metadata_writer = BackgroundWriter(save_audio_metadata, batch_function=save_audio_metadata_bulk)
+
+ALLOWED_EXTENSIONS = frozenset({'wav', 'mp3', 'm4a', 'ogg'})
+MAX_BATCH_FILES = 64
+
+# Extension for raw uploads posted without a filename, by content type
+RAW_AUDIO_EXTENSIONS = {
+    'audio/wav': 'wav',
+    'audio/wave': 'wav',
+    'audio/x-wav': 'wav',
+    'audio/mpeg': 'mp3',
+    'audio/mp3': 'mp3',
+    'audio/mp4': 'm4a',
+    'audio/x-m4a': 'm4a',
+    'audio/ogg': 'ogg'
+}
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    dot = filename.rfind('.')
+    return dot >= 0 and filename[dot + 1:].lower() in ALLOWED_EXTENSIONS
+
+@lru_cache(maxsize=1024)
+def safe_filename(filename):
+    """Sanitize an upload's filename, memoized for repeated names"""
+    return secure_filename(filename)
+
+def save_upload(file, filename):
+    """Stream an uploaded file to a unique temporary path in 1 MB chunks"""
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False) as tmp:
+        shutil.copyfileobj(file.stream, tmp, length=1 << 20)
+    return tmp.name
+
+def remove_upload(temp_path):
+    """Delete a temporary upload, ignoring files that are already gone"""
+    try:
+        os.unlink(temp_path)
+    except OSError:
+        pass
+
+def parse_feature_payload(features):
+    """
+    Convert real-time features to a columnar (N, 7) float32 array
+    
+    Accepts a base64 string of little-endian float32 values or a list of
+    rows, each holding FEATURE_KEYS in order. Legacy lists of per-frame
+    dictionaries are returned unchanged.
+    """
+    if isinstance(features, str):
+        buffer = np.frombuffer(base64.b64decode(features), dtype='<f4')
+        return buffer.reshape(-1, len(FEATURE_KEYS))
+    
+    if isinstance(features, list) and features and isinstance(features[0], list):
+        return np.asarray(features, dtype=np.float32)
+    
+    return features
+
+def analyze_upload(temp_path, filename, latitude, longitude, timestamp):
+    """Classify a saved upload, queue its metadata and build the response"""
+    # Extract MFCC features in a worker process
+    features = inference_pool.extract_features([temp_path])[0]
+    
+    # Classify audio
+    classification_results = classify_streamer.predict([features])[0]
+    
+    # Detect anomalies
+    anomaly_result = anomaly_streamer.predict([features])[0]
+    
+    # Estimate noise level
+    noise_level = classifier.estimate_noise_level(features, classification_results)
+    
+    # Queue metadata for saving to the database
+    metadata = {
+        'filename': filename,
+        'latitude': latitude,
+        'longitude': longitude,
+        'timestamp': timestamp,
+        'noise_level': noise_level,
+        'classification': classification_results,
+        'anomaly': anomaly_result
+    }
+    metadata_writer.submit(metadata)
+    
+    return {
+        'success': True,
+        'classification': classification_results,
+        'noise_level': noise_level,
+        'anomaly': anomaly_result,
+        'who_compliance': assess_who_compliance(noise_level),
+        'confidence_score': classification_results[0]['confidence']  # Results are sorted by confidence
+    }
 
 @audio_bp.route('/classify', methods=['POST'])
 def classify_audio():
@@ -41,55 +139,129 @@ def classify_audio():
         longitude = request.form.get('longitude', type=float)
         timestamp = request.form.get('timestamp')
         
-        # Save file temporarily
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(tempfile.gettempdir(), filename)
-        file.save(temp_path)
+        # Stream the upload straight to a temporary file
+        filename = safe_filename(file.filename)
+        temp_path = save_upload(file, filename)
         
         try:
-            # Extract MFCC features
-            features = extract_mfcc_features(temp_path)
+            return jsonify(analyze_upload(temp_path, filename, latitude, longitude, timestamp))
             
-            # Classify audio
-            classification_results = classifier.classify(features)
+        finally:
+            # Clean up temporary file
+            remove_upload(temp_path)
+                
+    except Exception as e:
+        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+@audio_bp.route('/classify_raw', methods=['POST'])
+def classify_audio_raw():
+    """Classify an audio file posted as the raw request body"""
+    try:
+        content_type = (request.mimetype or '').lower()
+        filename = request.args.get('filename', '')
+        
+        # The extension comes from the filename if given, else from the content type
+        if not filename and content_type in RAW_AUDIO_EXTENSIONS:
+            filename = f'upload.{RAW_AUDIO_EXTENSIONS[content_type]}'
+        
+        if not content_type.startswith('audio/') or not allowed_file(filename):
+            return jsonify({'error': 'Invalid file format'}), 400
+        
+        # Get optional metadata
+        latitude = request.args.get('latitude', type=float)
+        longitude = request.args.get('longitude', type=float)
+        timestamp = request.args.get('timestamp')
+        
+        # Copy the body straight from the socket, bypassing the multipart parser
+        filename = safe_filename(filename)
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False) as tmp:
+            temp_path = tmp.name
+            shutil.copyfileobj(request.stream, tmp, length=1 << 20)
+        
+        try:
+            if os.path.getsize(temp_path) == 0:
+                return jsonify({'error': 'No audio data provided'}), 400
             
-            # Detect anomalies
-            anomaly_result = anomaly_detector.detect(features)
+            return jsonify(analyze_upload(temp_path, filename, latitude, longitude, timestamp))
             
-            # Estimate noise level
-            noise_level = classifier.estimate_noise_level(features, classification_results)
+        finally:
+            # Clean up temporary file
+            remove_upload(temp_path)
+                
+    except Exception as e:
+        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+@audio_bp.route('/classify_batch', methods=['POST'])
+def classify_audio_batch():
+    """Classify several uploaded audio files with one batched model call"""
+    try:
+        files = request.files.getlist('audio')
+        
+        if not files:
+            return jsonify({'error': 'No audio files provided'}), 400
+        
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({'error': f'Too many files (max {MAX_BATCH_FILES})'}), 400
+        
+        for file in files:
+            if file.filename == '' or not allowed_file(file.filename):
+                return jsonify({'error': f'Invalid file format: {file.filename}'}), 400
+        
+        latitude = request.form.get('latitude', type=float)
+        longitude = request.form.get('longitude', type=float)
+        timestamp = request.form.get('timestamp')
+        
+        # Save each upload under a unique temporary name
+        filenames = []
+        temp_paths = []
+        try:
+            for file in files:
+                filename = safe_filename(file.filename)
+                temp_paths.append(save_upload(file, filename))
+                filenames.append(filename)
             
-            # Save metadata to database
-            metadata = {
-                'filename': filename,
-                'latitude': latitude,
-                'longitude': longitude,
-                'timestamp': timestamp,
-                'noise_level': noise_level,
-                'classification': classification_results,
-                'anomaly': anomaly_result
-            }
-            save_audio_metadata(metadata)
+            # Extract features in parallel, then classify the whole batch at once
+            features_batch = inference_pool.extract_features(temp_paths)
+            classifications = classifier.classify_many(features_batch)
+            anomalies = anomaly_detector.detect_many(features_batch)
             
-            # Prepare response
-            response = {
-                'success': True,
-                'classification': classification_results,
-                'noise_level': noise_level,
-                'anomaly': anomaly_result,
-                'who_compliance': assess_who_compliance(noise_level),
-                'confidence_score': max([result['confidence'] for result in classification_results])
-            }
+            noise_levels = [
+                classifier.estimate_noise_level(features, classification_results)
+                for features, classification_results in zip(features_batch, classifications)
+            ]
+            who_compliance = assess_who_compliance_many(noise_levels)
             
-            return jsonify(response)
+            results = []
+            for filename, classification_results, anomaly_result, noise_level, compliance in zip(
+                filenames, classifications, anomalies, noise_levels, who_compliance
+            ):
+                metadata_writer.submit({
+                    'filename': filename,
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'timestamp': timestamp,
+                    'noise_level': noise_level,
+                    'classification': classification_results,
+                    'anomaly': anomaly_result
+                })
+                
+                results.append({
+                    'filename': filename,
+                    'classification': classification_results,
+                    'noise_level': noise_level,
+                    'anomaly': anomaly_result,
+                    'who_compliance': compliance,
+                    'confidence_score': classification_results[0]['confidence']  # Results are sorted by confidence
+                })
+            
+            return jsonify({'success': True, 'count': len(results), 'results': results})
             
         finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            for temp_path in temp_paths:
+                remove_upload(temp_path)
                 
     except Exception as e:
-        return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+        return jsonify({'error': f'Batch processing failed: {str(e)}'}), 500
 
 @audio_bp.route('/real-time', methods=['POST'])
 def real_time_analysis():
@@ -101,7 +273,10 @@ def real_time_analysis():
         if not audio_data or 'features' not in audio_data:
             return jsonify({'error': 'No audio features provided'}), 400
         
-        features = audio_data['features']
+        try:
+            features = parse_feature_payload(audio_data['features'])
+        except ValueError as e:
+            return jsonify({'error': f'Invalid feature buffer: {str(e)}'}), 400
         
         # Quick classification for real-time
         classification = classifier.quick_classify(features)
@@ -148,26 +323,32 @@ def calibrate_system():
     except Exception as e:
         return jsonify({'error': f'Calibration failed: {str(e)}'}), 500
 
+# Compliance category for each WHO band, safe to critical
+WHO_CATEGORIES = (
+    {
+        'status': 'Within Safe Limits',
+        'color': '#27ae60',
+        'exceeds_limit': False,
+        'limit_type': 'Safe'
+    },
+    {
+        'status': 'Exceeds WHO Daytime Limit',
+        'color': '#f39c12',
+        'exceeds_limit': True,
+        'limit_type': 'Daytime Limit'
+    },
+    {
+        'status': 'Critical - Health Risk',
+        'color': '#e74c3c',
+        'exceeds_limit': True,
+        'limit_type': 'Critical Threshold'
+    }
+)
+
 def assess_who_compliance(noise_level):
     """Assess WHO noise compliance"""
-    if noise_level >= 70:
-        return {
-            'status': 'Critical - Health Risk',
-            'color': '#e74c3c',
-            'exceeds_limit': True,
-            'limit_type': 'Critical Threshold'
-        }
-    elif noise_level >= 55:
-        return {
-            'status': 'Exceeds WHO Daytime Limit',
-            'color': '#f39c12',
-            'exceeds_limit': True,
-            'limit_type': 'Daytime Limit'
-        }
-    else:
-        return {
-            'status': 'Within Safe Limits',
-            'color': '#27ae60',
-            'exceeds_limit': False,
-            'limit_type': 'Safe'
-        }
\ No newline at end of file
+    return who_category(noise_level, WHO_CATEGORIES)
+
+def assess_who_compliance_many(noise_levels):
+    """Assess WHO noise compliance for a batch of noise levels"""
+    return who_categories(noise_levels, WHO_CATEGORIES)
\ No newline at end of file
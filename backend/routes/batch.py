@@ -0,0 +1,226 @@
+# Bulk classification routes
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+import json
+import numpy as np
+from models.registry import get_classifier
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib encoder for result lines
+
+batch_bp = Blueprint('batch', __name__)
+
+# Same classifier instance as the audio routes
+classifier = get_classifier()
+
+# Background workers and in-memory job registry
+executor = ThreadPoolExecutor(max_workers=2)
+batch_jobs = {}
+jobs_lock = threading.Lock()
+
+MAX_BATCH_LINES = 100000
+
+# Finished jobs are kept this long for result download, and at most this many at once
+JOB_TTL_SECONDS = 3600
+MAX_FINISHED_JOBS = 100
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch upload has more lines than allowed"""
+
+def shutdown_batch_executor():
+    """Stop the batch workers, dropping jobs that have not started"""
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def evict_finished_jobs():
+    """Drop expired finished jobs, then the oldest ones beyond MAX_FINISHED_JOBS; call with jobs_lock held"""
+    now = time.monotonic()
+    finished = []
+    for job_id, job in list(batch_jobs.items()):
+        if job['expires'] is None:
+            continue
+        if job['expires'] <= now:
+            del batch_jobs[job_id]
+        else:
+            finished.append((job['expires'], job_id))
+    
+    finished.sort()
+    for _, job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del batch_jobs[job_id]
+
+def job_snapshot(job_id):
+    """Copy of a job's fields taken under jobs_lock, or None if unknown"""
+    with jobs_lock:
+        evict_finished_jobs()
+        job = batch_jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+@batch_bp.route('', methods=['POST'])
+def submit_batch():
+    """Submit a JSON-Lines file of feature vectors for offline classification"""
+    try:
+        if 'batch' in request.files:
+            stream = request.files['batch'].stream
+        else:
+            stream = request.stream
+        
+        try:
+            ids, rows, errors = parse_batch_lines(stream, MAX_BATCH_LINES)
+        except BatchTooLargeError:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_LINES} lines)'}), 400
+        
+        if not ids and not errors:
+            return jsonify({'error': 'Batch file is empty'}), 400
+        
+        job_id = str(uuid.uuid4())
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'created_at': datetime.now().isoformat(),
+            'completed_at': None,
+            'expires_at': None,
+            'expires': None,
+            'total': len(ids),
+            'invalid': len(errors),
+            'results': None,
+            'errors': errors,
+            'error': None
+        }
+        
+        with jobs_lock:
+            evict_finished_jobs()
+            batch_jobs[job_id] = job
+        
+        executor.submit(run_batch_job, job_id, ids, rows)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'total': len(ids),
+            'invalid': len(errors)
+        }), 202
+    
+    except Exception as e:
+        return jsonify({'error': f'Batch submission failed: {str(e)}'}), 500
+
+@batch_bp.route('/<job_id>', methods=['GET'])
+def get_batch_status(job_id):
+    """Get the status of a batch classification job"""
+    job = job_snapshot(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Batch job not found'}), 404
+    
+    return jsonify({
+        'job_id': job['id'],
+        'status': job['status'],
+        'created_at': job['created_at'],
+        'completed_at': job['completed_at'],
+        'expires_at': job['expires_at'],
+        'total': job['total'],
+        'invalid': job['invalid'],
+        'error': job['error']
+    })
+
+@batch_bp.route('/<job_id>/results', methods=['GET'])
+def get_batch_results(job_id):
+    """Stream the results of a completed batch job as JSON-Lines"""
+    # The result lists are not modified once a job completes, so the snapshot can stream them
+    job = job_snapshot(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Batch job not found'}), 404
+    
+    if job['status'] != 'completed':
+        return jsonify({'error': f"Batch job is {job['status']}"}), 409
+    
+    def generate():
+        for entry in job['results']:
+            yield encode_line(entry)
+        for entry in job['errors']:
+            yield encode_line(entry)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def encode_line(entry):
+    """Encode one JSON-Lines record"""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(entry) + '\n'
+
+def parse_batch_lines(stream, max_lines=MAX_BATCH_LINES):
+    """Parse JSON-Lines input into ids and a stacked (N, 13) feature matrix, stopping past max_lines"""
+    ids = []
+    vectors = []
+    errors = []
+    
+    for line_number, line in enumerate(stream, start=1):
+        if line_number > max_lines:
+            raise BatchTooLargeError(f'more than {max_lines} lines')
+        
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            entry = orjson.loads(line) if orjson is not None else json.loads(line)
+            features = np.asarray(entry['features'], dtype=np.float32).ravel()
+            if features.size == 0:
+                raise ValueError('empty feature vector')
+        except Exception as e:
+            errors.append({'line': line_number, 'error': f'Invalid entry: {str(e)}'})
+            continue
+        
+        ids.append(entry.get('id', line_number))
+        vectors.append(features[:13])
+    
+    # Stack into a fixed-width matrix, zero-padding short vectors
+    rows = np.zeros((len(vectors), 13), dtype=np.float32)
+    for i, features in enumerate(vectors):
+        rows[i, :len(features)] = features
+    
+    return ids, rows, errors
+
+def update_job(job_id, **fields):
+    """Set fields of a job under jobs_lock"""
+    with jobs_lock:
+        job = batch_jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+def run_batch_job(job_id, ids, rows):
+    """Classify all rows of a batch job with a single model call"""
+    update_job(job_id, status='running')
+    fields = {}
+    
+    try:
+        results = []
+        if ids:
+            probabilities = classifier.classify_batch(rows)
+            for entry_id, probs in zip(ids, probabilities):
+                results.append({
+                    'id': entry_id,
+                    'classification': classifier.format_results(probs)
+                })
+        
+        fields = {'results': results, 'status': 'completed'}
+    
+    except Exception as e:
+        print(f"Batch job {job_id} failed: {e}")
+        fields = {'error': str(e), 'status': 'failed'}
+    
+    finally:
+        now = datetime.now()
+        update_job(
+            job_id,
+            completed_at=now.isoformat(),
+            expires_at=(now + timedelta(seconds=JOB_TTL_SECONDS)).isoformat(),
+            expires=time.monotonic() + JOB_TTL_SECONDS,
+            **fields
+        )
\ No newline at end of file
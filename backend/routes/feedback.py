@@ -1,8 +1,16 @@
 # Citizen feedback routes
 from flask import Blueprint, request, jsonify
 from datetime import datetime
+from functools import lru_cache
 from utils.db_handler import save_feedback, get_feedback_stats
+from utils.cache import cache
 import re
+import threading
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # use the compiled regex scan instead
 
 feedback_bp = Blueprint('feedback', __name__)
 
@@ -45,6 +53,7 @@ def submit_feedback():
         
         # Save to database
         feedback_id = save_feedback(feedback_entry)
+        cache.delete_memoized(cached_feedback_stats)
         
         response = {
             'success': True,
@@ -62,7 +71,7 @@ def submit_feedback():
 def get_stats():
     """Get feedback statistics"""
     try:
-        stats = get_feedback_stats()
+        stats = cached_feedback_stats()
         
         response = {
             'total_reports': stats.get('total', 0),
@@ -77,6 +86,11 @@ def get_stats():
     except Exception as e:
         return jsonify({'error': f'Failed to get stats: {str(e)}'}), 500
 
+@cache.memoize(timeout=60)
+def cached_feedback_stats():
+    """Feedback statistics, recomputed at most once a minute or after new feedback"""
+    return get_feedback_stats()
+
 @feedback_bp.route('/recent', methods=['GET'])
 def get_recent_feedback():
     """Get recent feedback entries"""
@@ -106,54 +120,134 @@ def get_recent_feedback():
     except Exception as e:
         return jsonify({'error': f'Failed to get recent feedback: {str(e)}'}), 500
 
+# Keyword groups scanned by analyze_feedback, in reporting order
+NOISE_SOURCE_KEYWORDS = {
+    'traffic': ('car', 'traffic', 'vehicle', 'truck', 'motorcycle'),
+    'construction': ('construction', 'drill', 'hammer', 'building', 'work'),
+    'human': ('music', 'party', 'loud', 'neighbor', 'voice'),
+    'emergency': ('siren', 'alarm', 'emergency'),
+    'industrial': ('industrial', 'factory', 'machine', 'equipment')
+}
+URGENCY_KEYWORDS = {
+    'high': ('urgent', 'emergency', 'extremely', 'unbearable', 'constant'),
+    'medium': ('loud', 'disruptive', 'annoying', 'frequent')
+}
+TIME_KEYWORDS = {
+    'night': ('night', 'evening', 'late'),
+    'morning': ('morning', 'early'),
+    'day': ('day', 'afternoon')
+}
+SENTIMENT_KEYWORDS = {
+    'negative': ('terrible', 'awful', 'annoying', 'disturbing', 'unbearable', 'loud', 'noise'),
+    'positive': ('quiet', 'peaceful', 'better', 'improved', 'good')
+}
+
+def _build_keyword_index():
+    """Map every keyword to the (group, tag) pairs it belongs to"""
+    index = {}
+    for group, keywords in (
+        ('source', NOISE_SOURCE_KEYWORDS),
+        ('urgency', URGENCY_KEYWORDS),
+        ('time', TIME_KEYWORDS),
+        ('sentiment', SENTIMENT_KEYWORDS)
+    ):
+        for tag, words in keywords.items():
+            for word in words:
+                index.setdefault(word, []).append((group, tag))
+    return index
+
+_KEYWORD_INDEX = _build_keyword_index()
+
+# One alternation over all keywords, tried at every position (zero-width
+# lookahead) so overlapping substrings match just like the `in` checks did
+_KEYWORD_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(word) for word in sorted(_KEYWORD_INDEX, key=len, reverse=True)) + '))'
+)
+
+_KEYWORDS = tuple(_KEYWORD_INDEX)
+
+def _build_hyperscan_database():
+    """Compile every keyword into one Hyperscan block-mode database"""
+    if hyperscan is None:
+        return None
+    
+    try:
+        database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        database.compile(
+            expressions=[re.escape(word).encode() for word in _KEYWORDS],
+            ids=list(range(len(_KEYWORDS))),
+            elements=len(_KEYWORDS),
+            # Each keyword only needs to be reported once per scan
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(_KEYWORDS)
+        )
+        return database
+    except Exception as e:
+        print(f"Hyperscan compile error: {e}, using regex keyword scan")
+        return None
+
+_HYPERSCAN_DATABASE = _build_hyperscan_database()
+
+# Hyperscan scratch space may not be shared between concurrent scans
+_hyperscan_local = threading.local()
+
+def _scan_keywords(text_lower):
+    """Return the set of keywords occurring anywhere in the text"""
+    if _HYPERSCAN_DATABASE is not None:
+        scratch = getattr(_hyperscan_local, 'scratch', None)
+        if scratch is None:
+            scratch = _hyperscan_local.scratch = hyperscan.Scratch(_HYPERSCAN_DATABASE)
+        
+        found = set()
+        
+        def on_match(keyword_id, start, end, flags, context):
+            found.add(_KEYWORDS[keyword_id])
+        
+        _HYPERSCAN_DATABASE.scan(text_lower.encode('utf-8'), match_event_handler=on_match, scratch=scratch)
+        return found
+    
+    return {match.group(1) for match in _KEYWORD_PATTERN.finditer(text_lower)}
+
 def analyze_feedback(feedback_text):
     """Analyze feedback text for noise type and urgency"""
-    feedback_lower = feedback_text.lower()
+    # Single scan of the text for every keyword group
+    found = _scan_keywords(feedback_text.lower())
+    tags = {(group, tag) for word in found for group, tag in _KEYWORD_INDEX[word]}
     
     # Noise source detection
-    noise_sources = []
-    if any(word in feedback_lower for word in ['car', 'traffic', 'vehicle', 'truck', 'motorcycle']):
-        noise_sources.append('traffic')
-    if any(word in feedback_lower for word in ['construction', 'drill', 'hammer', 'building', 'work']):
-        noise_sources.append('construction')
-    if any(word in feedback_lower for word in ['music', 'party', 'loud', 'neighbor', 'voice']):
-        noise_sources.append('human')
-    if any(word in feedback_lower for word in ['siren', 'alarm', 'emergency']):
-        noise_sources.append('emergency')
-    if any(word in feedback_lower for word in ['industrial', 'factory', 'machine', 'equipment']):
-        noise_sources.append('industrial')
+    noise_sources = [source for source in NOISE_SOURCE_KEYWORDS if ('source', source) in tags]
     
     # Urgency detection
     urgency = 'low'
-    if any(word in feedback_lower for word in ['urgent', 'emergency', 'extremely', 'unbearable', 'constant']):
+    if ('urgency', 'high') in tags:
         urgency = 'high'
-    elif any(word in feedback_lower for word in ['loud', 'disruptive', 'annoying', 'frequent']):
+    elif ('urgency', 'medium') in tags:
         urgency = 'medium'
     
     # Time of day detection
-    time_indicators = []
-    if any(word in feedback_lower for word in ['night', 'evening', 'late']):
-        time_indicators.append('night')
-    if any(word in feedback_lower for word in ['morning', 'early']):
-        time_indicators.append('morning')
-    if any(word in feedback_lower for word in ['day', 'afternoon']):
-        time_indicators.append('day')
+    time_indicators = [period for period in TIME_KEYWORDS if ('time', period) in tags]
     
     return {
         'noise_sources': noise_sources,
         'urgency': urgency,
         'time_indicators': time_indicators,
-        'sentiment': analyze_sentiment(feedback_text)
+        'sentiment': _sentiment_from_keywords(found)
     }
 
 def analyze_sentiment(text):
     """Simple sentiment analysis"""
-    negative_words = ['terrible', 'awful', 'annoying', 'disturbing', 'unbearable', 'loud', 'noise']
-    positive_words = ['quiet', 'peaceful', 'better', 'improved', 'good']
-    
-    text_lower = text.lower()
-    negative_count = sum(1 for word in negative_words if word in text_lower)
-    positive_count = sum(1 for word in positive_words if word in text_lower)
+    return _sentiment_from_keywords(_scan_keywords(text.lower()))
+
+def _sentiment_from_keywords(found):
+    """Compare the number of distinct negative and positive keywords found"""
+    # One pass over the few keywords found instead of a scan of each keyword list
+    negative_count = positive_count = 0
+    for word in found:
+        for group, tag in _KEYWORD_INDEX[word]:
+            if group == 'sentiment':
+                if tag == 'negative':
+                    negative_count += 1
+                else:
+                    positive_count += 1
     
     if negative_count > positive_count:
         return 'negative'
@@ -168,9 +262,11 @@ def approximate_area(latitude, longitude):
         return 'Unknown'
     
     # Round coordinates to approximate area (reduces precision for privacy)
-    approx_lat = round(latitude, 2)
-    approx_lng = round(longitude, 2)
-    
+    return _area_label(round(latitude, 2), round(longitude, 2))
+
+@lru_cache(maxsize=256)
+def _area_label(approx_lat, approx_lng):
+    """Area label for already-rounded coordinates"""
     return f"Area near {approx_lat}, {approx_lng}"
 
 def get_recent_feedback_from_db(limit):
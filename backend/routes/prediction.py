@@ -1,12 +1,41 @@
 # Noise prediction routes
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
-import json
-from models.classifier import AudioClassifier
+from functools import lru_cache
+from collections import Counter
+import numpy as np
 from utils.db_handler import get_historical_data
+from utils.jit import njit
+from utils.cache import cache
+from utils.who_compliance import who_category, who_categories
 
 prediction_bp = Blueprint('prediction', __name__)
 
+# Random source for the mock trend data
+_RNG = np.random.default_rng()
+
+# Horizons shorter than this run the compiled scalar kernel hour by hour
+SCALAR_HORIZON_MAX_HOURS = 8
+
+@njit(cache=True)
+def _predict_hour_nb(mean_table, std_table, default_table, traffic_table, weather_adjustment, hour, day_of_week):
+    """Predicted dB and uncertainty for one hour from the precomputed tables"""
+    # No fastmath: the NaN checks mark slots without history
+    base = mean_table[day_of_week, hour]
+    if np.isnan(base):
+        base = default_table[day_of_week, hour]
+    
+    predicted = base + weather_adjustment + traffic_table[day_of_week, hour]
+    predicted = max(35.0, min(100.0, predicted))
+    
+    uncertainty = std_table[hour]
+    if np.isnan(uncertainty):
+        uncertainty = 5.0
+    else:
+        uncertainty = min(15.0, uncertainty)
+    
+    return predicted, uncertainty
+
 @prediction_bp.route('/forecast', methods=['POST'])
 def forecast_noise():
     """Generate noise level predictions"""
@@ -74,6 +103,7 @@ def get_noise_trends():
         return jsonify({'error': f'Trend analysis failed: {str(e)}'}), 500
 
 @prediction_bp.route('/hotspots', methods=['GET'])
+@cache.cached(timeout=30, query_string=True)
 def get_noise_hotspots():
     """Identify noise pollution hotspots"""
     try:
@@ -103,60 +133,99 @@ def get_noise_hotspots():
 
 def generate_noise_predictions(lat, lng, hours, weather, historical_data):
     """Generate noise level predictions using historical patterns and weather"""
-    predictions = []
     current_time = datetime.now()
     
-    for i in range(hours):
-        future_time = current_time + timedelta(hours=i)
-        hour_of_day = future_time.hour
-        day_of_week = future_time.weekday()
-        
-        # Base prediction from historical averages
-        base_noise = get_historical_average(historical_data, hour_of_day, day_of_week)
-        
-        # Weather adjustments
-        weather_adjustment = get_weather_adjustment(weather)
-        
-        # Traffic pattern adjustments
-        traffic_adjustment = get_traffic_adjustment(hour_of_day, day_of_week)
-        
-        # Calculate final prediction
-        predicted_noise = base_noise + weather_adjustment + traffic_adjustment
-        predicted_noise = max(35, min(100, predicted_noise))  # Clamp to realistic range
-        
-        # Calculate uncertainty based on historical variance
-        uncertainty = calculate_prediction_uncertainty(historical_data, hour_of_day)
+    # Aggregate the history once instead of rescanning it for every hour
+    mean_table, std_table = build_history_tables(historical_data)
+    
+    # Forecast timestamps and their calendar fields as arrays
+    future_times = np.datetime64(current_time, 'us') + np.arange(max(hours, 0)).astype('timedelta64[h]')
+    hours_of_day = (future_times.astype('datetime64[h]').astype(np.int64) % 24).astype(np.intp)
+    days_since_monday = future_times.astype('datetime64[D]') - np.datetime64('1970-01-05')
+    days_of_week = (days_since_monday.astype(np.int64) % 7).astype(np.intp)
+    
+    # Weather and traffic pattern adjustments
+    weather_adjustment = float(get_weather_adjustment(weather))
+    dominant_sources = DOMINANT_SOURCE_TABLE[days_of_week, hours_of_day]
+    
+    if hours < SCALAR_HORIZON_MAX_HOURS:
+        # Short horizons: per-hour compiled kernel avoids array-op overhead
+        predicted_noise = np.empty(len(future_times))
+        uncertainty = np.empty(len(future_times))
+        for i in range(len(future_times)):
+            predicted_noise[i], uncertainty[i] = _predict_hour_nb(
+                mean_table, std_table, DEFAULT_NOISE_TABLE, TRAFFIC_TABLE,
+                weather_adjustment, hours_of_day[i], days_of_week[i]
+            )
+    else:
+        # Base prediction from historical averages, default pattern where there is no history
+        base_noise = mean_table[days_of_week, hours_of_day]
+        base_noise = np.where(np.isnan(base_noise), DEFAULT_NOISE_TABLE[days_of_week, hours_of_day], base_noise)
         
-        prediction = {
-            'timestamp': future_time.isoformat(),
-            'predicted_db': round(predicted_noise, 1),
-            'uncertainty': round(uncertainty, 2),
-            'confidence': round((1 - uncertainty/20) * 100, 1),  # Convert to percentage
-            'dominant_source': predict_dominant_source(hour_of_day, day_of_week),
-            'who_compliance': assess_who_compliance_prediction(predicted_noise)
-        }
+        # Calculate final predictions, clamped to a realistic range
+        traffic_adjustment = TRAFFIC_TABLE[days_of_week, hours_of_day]
+        predicted_noise = np.clip(base_noise + weather_adjustment + traffic_adjustment, 35, 100)
         
-        predictions.append(prediction)
+        # Uncertainty from historical variance for each hour, capped at 15 dB
+        uncertainty = np.minimum(std_table[hours_of_day], 15.0)
+        uncertainty[np.isnan(uncertainty)] = 5.0
+    
+    who_compliance = assess_who_compliance_many(predicted_noise)
     
-    return predictions
+    # Match datetime.isoformat(), which leaves out a zero microsecond field
+    timestamps = np.datetime_as_string(future_times, unit='us' if current_time.microsecond else 's')
+    
+    return [
+        {
+            'timestamp': timestamp,
+            'predicted_db': round(noise, 1),
+            'uncertainty': round(hour_uncertainty, 2),
+            'confidence': round((1 - hour_uncertainty/20) * 100, 1),  # Convert to percentage
+            'dominant_source': dominant_source,
+            'who_compliance': compliance
+        }
+        for timestamp, noise, hour_uncertainty, dominant_source, compliance in zip(
+            timestamps.tolist(), predicted_noise.tolist(), uncertainty.tolist(),
+            dominant_sources.tolist(), who_compliance
+        )
+    ]
 
-def get_historical_average(historical_data, hour, day_of_week):
-    """Get historical average for specific hour and day"""
+def build_history_tables(historical_data):
+    """
+    Aggregate a HistoricalBlock of readings into lookup tables
+    
+    Returns a (7, 24) table of mean noise levels per day of week and hour,
+    and a (24,) table of per-hour standard deviations. Slots without enough
+    data hold NaN.
+    """
+    mean_table = np.full((7, 24), np.nan)
+    std_table = np.full(24, np.nan)
+    
     if not historical_data:
-        # Fallback pattern if no historical data
-        return get_default_noise_pattern(hour, day_of_week)
+        return mean_table, std_table
     
-    # Filter historical data for same hour and day of week
-    relevant_data = [
-        entry for entry in historical_data 
-        if entry['hour'] == hour and entry['day_of_week'] == day_of_week
-    ]
+    hours = historical_data.hours
+    days = historical_data.days_of_week
+    levels = historical_data.levels
     
-    if relevant_data:
-        return sum(entry['noise_level'] for entry in relevant_data) / len(relevant_data)
-    else:
-        return get_default_noise_pattern(hour, day_of_week)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Group by (day, hour) slot with bincount sums
+        slots = days * 24 + hours
+        slot_counts = np.bincount(slots, minlength=7 * 24)
+        slot_sums = np.bincount(slots, weights=levels, minlength=7 * 24)
+        mean_table = (slot_sums / slot_counts).reshape(7, 24)
+        
+        # Population standard deviation per hour across all days
+        hour_counts = np.bincount(hours, minlength=24)
+        hour_means = np.bincount(hours, weights=levels, minlength=24) / hour_counts
+        deviations = levels - hour_means[hours]
+        variances = np.bincount(hours, weights=deviations * deviations, minlength=24) / hour_counts
+    
+    std_table = np.where(hour_counts >= 2, np.sqrt(variances), np.nan)
+    
+    return mean_table, std_table
 
+@lru_cache(maxsize=256)
 def get_default_noise_pattern(hour, day_of_week):
     """Default noise pattern when no historical data available"""
     # Weekend vs weekday
@@ -181,18 +250,10 @@ def get_default_noise_pattern(hour, day_of_week):
 
 def get_weather_adjustment(weather):
     """Adjust prediction based on weather conditions"""
-    adjustments = {
-        'clear': 0,
-        'rain': -5,  # Rain dampens noise
-        'heavy_rain': -8,
-        'snow': -3,
-        'wind': 3,   # Wind can amplify noise
-        'fog': -2
-    }
-    return adjustments.get(weather, 0)
+    return WEATHER_ADJUSTMENTS.get(weather, 0)
 
-def get_traffic_adjustment(hour, day_of_week):
-    """Adjust for traffic patterns"""
+def _traffic_adjustment_rule(hour, day_of_week):
+    """Traffic pattern rules used to fill TRAFFIC_TABLE"""
     is_weekend = day_of_week >= 5
     
     if is_weekend:
@@ -206,24 +267,8 @@ def get_traffic_adjustment(hour, day_of_week):
     else:
         return 0
 
-def calculate_prediction_uncertainty(historical_data, hour):
-    """Calculate uncertainty based on historical variance"""
-    if not historical_data:
-        return 5.0  # Default uncertainty
-    
-    # Get variance for this hour
-    hour_data = [entry['noise_level'] for entry in historical_data if entry['hour'] == hour]
-    
-    if len(hour_data) < 2:
-        return 5.0
-    
-    # Calculate standard deviation as uncertainty measure
-    mean = sum(hour_data) / len(hour_data)
-    variance = sum((x - mean) ** 2 for x in hour_data) / len(hour_data)
-    return min(15.0, variance ** 0.5)  # Cap uncertainty at 15 dB
-
-def predict_dominant_source(hour, day_of_week):
-    """Predict dominant noise source based on time patterns"""
+def _dominant_source_rule(hour, day_of_week):
+    """Time pattern rules used to fill DOMINANT_SOURCE_TABLE"""
     is_weekend = day_of_week >= 5
     
     if 7 <= hour <= 9 or 17 <= hour <= 19:  # Rush hours
@@ -237,14 +282,47 @@ def predict_dominant_source(hour, day_of_week):
     else:
         return 'mixed'
 
+# Weather adjustments in dB
+WEATHER_ADJUSTMENTS = {
+    'clear': 0,
+    'rain': -5,  # Rain dampens noise
+    'heavy_rain': -8,
+    'snow': -3,
+    'wind': 3,   # Wind can amplify noise
+    'fog': -2
+}
+
+# Time pattern rules evaluated once for every (day_of_week, hour)
+DEFAULT_NOISE_TABLE = np.array(
+    [[get_default_noise_pattern(hour, day) for hour in range(24)] for day in range(7)],
+    dtype=np.float64
+)
+TRAFFIC_TABLE = np.array(
+    [[_traffic_adjustment_rule(hour, day) for hour in range(24)] for day in range(7)],
+    dtype=np.int8
+)
+DOMINANT_SOURCE_TABLE = np.array(
+    [[_dominant_source_rule(hour, day) for hour in range(24)] for day in range(7)],
+    dtype=object
+)
+
+# Compile the scalar kernel at import rather than on the first request
+_predict_hour_nb(np.zeros((7, 24)), np.zeros(24), DEFAULT_NOISE_TABLE, TRAFFIC_TABLE, 0.0, 0, 0)
+
+# Compliance category for each WHO band, safe to critical
+WHO_CATEGORIES = (
+    {'status': 'Within Safe Limits', 'exceeds_limit': False},
+    {'status': 'Exceeds Daytime Limit', 'exceeds_limit': True},
+    {'status': 'Critical', 'exceeds_limit': True}
+)
+
 def assess_who_compliance_prediction(predicted_db):
     """Assess WHO compliance for predicted noise level"""
-    if predicted_db >= 70:
-        return {'status': 'Critical', 'exceeds_limit': True}
-    elif predicted_db >= 55:
-        return {'status': 'Exceeds Daytime Limit', 'exceeds_limit': True}
-    else:
-        return {'status': 'Within Safe Limits', 'exceeds_limit': False}
+    return who_category(predicted_db, WHO_CATEGORIES)
+
+def assess_who_compliance_many(predicted_levels):
+    """Assess WHO compliance for an array of predicted noise levels"""
+    return who_categories(predicted_levels, WHO_CATEGORIES)
 
 def calculate_confidence_interval(predictions):
     """Calculate overall confidence interval for predictions"""
@@ -287,21 +365,19 @@ def generate_hourly_averages():
 
 def generate_daily_averages(days):
     """Generate daily averages for trend analysis"""
-    import random
     base_level = 62
+    today = datetime.now()
     
-    daily_averages = []
-    for i in range(days):
-        # Add some realistic variation
-        daily_avg = base_level + random.uniform(-5, 5)
-        date = (datetime.now() - timedelta(days=days-i)).date().isoformat()
-        
-        daily_averages.append({
-            'date': date,
-            'average_db': round(daily_avg, 1)
-        })
+    # Add some realistic variation, drawn for all days at once
+    variations = _RNG.uniform(-5, 5, size=max(days, 0)).tolist()
     
-    return daily_averages
+    return [
+        {
+            'date': (today - timedelta(days=days-i)).date().isoformat(),
+            'average_db': round(base_level + variation, 1)
+        }
+        for i, variation in enumerate(variations)
+    ]
 
 def identify_peak_hours(trends):
     """Identify peak noise hours"""
@@ -310,14 +386,15 @@ def identify_peak_hours(trends):
     if not hourly_data:
         return []
     
-    # Find hours with noise levels above 70 dB
-    peak_hours = [
-        {'hour': entry['hour'], 'level': entry['average_db']}
-        for entry in hourly_data 
-        if entry['average_db'] > 70
-    ]
+    # Find hours with noise levels above 70 dB, loudest first (stable for ties)
+    levels = np.array([entry['average_db'] for entry in hourly_data], dtype=np.float64)
+    peak_indices = np.flatnonzero(levels > 70)
+    peak_indices = peak_indices[np.argsort(-levels[peak_indices], kind='stable')]
     
-    return sorted(peak_hours, key=lambda x: x['level'], reverse=True)
+    return [
+        {'hour': hourly_data[i]['hour'], 'level': hourly_data[i]['average_db']}
+        for i in peak_indices.tolist()
+    ]
 
 def identify_seasonal_patterns(trends):
     """Identify seasonal noise patterns"""
@@ -333,56 +410,54 @@ def identify_seasonal_patterns(trends):
         }
     }
 
+# Mock hotspot data - in production, query spatial database
+_HOTSPOTS = [
+    {
+        'id': 1,
+        'location': {'latitude': 40.7589, 'longitude': -73.9851},
+        'average_db': 78.5,
+        'peak_db': 85.2,
+        'dominant_source': 'traffic',
+        'severity': 'high',
+        'area_description': 'Times Square area',
+        'measurement_count': 245
+    },
+    {
+        'id': 2,
+        'location': {'latitude': 40.7505, 'longitude': -73.9934},
+        'average_db': 82.1,
+        'peak_db': 92.3,
+        'dominant_source': 'construction',
+        'severity': 'critical',
+        'area_description': 'Construction zone',
+        'measurement_count': 156
+    },
+    {
+        'id': 3,
+        'location': {'latitude': 40.7411, 'longitude': -73.9897},
+        'average_db': 74.8,
+        'peak_db': 81.6,
+        'dominant_source': 'traffic',
+        'severity': 'high',
+        'area_description': 'Major intersection',
+        'measurement_count': 189
+    }
+]
+
+# Numeric hotspot columns for mask-based filtering
+_HOTSPOT_AVERAGE_DB = np.array([hotspot['average_db'] for hotspot in _HOTSPOTS])
+
 def identify_noise_hotspots(radius_km, threshold_db, time_period):
     """Identify noise pollution hotspots"""
-    # Mock hotspot data - in production, query spatial database
-    hotspots = [
-        {
-            'id': 1,
-            'location': {'latitude': 40.7589, 'longitude': -73.9851},
-            'average_db': 78.5,
-            'peak_db': 85.2,
-            'dominant_source': 'traffic',
-            'severity': 'high',
-            'area_description': 'Times Square area',
-            'measurement_count': 245
-        },
-        {
-            'id': 2,
-            'location': {'latitude': 40.7505, 'longitude': -73.9934},
-            'average_db': 82.1,
-            'peak_db': 92.3,
-            'dominant_source': 'construction',
-            'severity': 'critical',
-            'area_description': 'Construction zone',
-            'measurement_count': 156
-        },
-        {
-            'id': 3,
-            'location': {'latitude': 40.7411, 'longitude': -73.9897},
-            'average_db': 74.8,
-            'peak_db': 81.6,
-            'dominant_source': 'traffic',
-            'severity': 'high',
-            'area_description': 'Major intersection',
-            'measurement_count': 189
-        }
-    ]
-    
     # Filter by threshold
-    filtered_hotspots = [hs for hs in hotspots if hs['average_db'] >= threshold_db]
-    
-    return filtered_hotspots
+    return [dict(_HOTSPOTS[i]) for i in np.flatnonzero(_HOTSPOT_AVERAGE_DB >= threshold_db)]
 
 def calculate_severity_distribution(hotspots):
     """Calculate severity distribution of hotspots"""
     if not hotspots:
         return {}
     
-    severity_counts = {}
-    for hotspot in hotspots:
-        severity = hotspot['severity']
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+    severity_counts = Counter(hotspot['severity'] for hotspot in hotspots)
     
     total = len(hotspots)
     return {
@@ -13,26 +13,45 @@ from .audio_features import (
     extract_spectral_features,
     extract_temporal_features,
     extract_noise_level_features,
+    extract_features_from_blobs,
     validate_audio_file
 )
 
 from .db_handler import (
     save_audio_metadata,
+    save_audio_metadata_bulk,
     save_feedback,
+    save_feedback_bulk,
     get_feedback_stats,
     get_historical_data,
-    DatabaseHandler
+    get_area_noise_data,
+    DatabaseHandler,
+    HistoricalBlock
 )
 
+from .batching import create_streamer, shutdown_streamers
+from .inference_pool import InferencePool, shutdown_inference_pool
+from .write_queue import BackgroundWriter
+
 __all__ = [
     'extract_mfcc_features',
     'extract_spectral_features', 
     'extract_temporal_features',
     'extract_noise_level_features',
+    'extract_features_from_blobs',
     'validate_audio_file',
     'save_audio_metadata',
+    'save_audio_metadata_bulk',
     'save_feedback',
+    'save_feedback_bulk',
     'get_feedback_stats',
     'get_historical_data',
-    'DatabaseHandler'
+    'get_area_noise_data',
+    'DatabaseHandler',
+    'HistoricalBlock',
+    'create_streamer',
+    'shutdown_streamers',
+    'InferencePool',
+    'shutdown_inference_pool',
+    'BackgroundWriter'
 ]
\ No newline at end of file
@@ -1,46 +1,121 @@
 # Audio Feature Extraction Utilities
 import librosa
 import numpy as np
+import soundfile
 import scipy.signal
+import scipy.special
+import scipy.fft
+from functools import lru_cache
 from scipy.io import wavfile
 import tempfile
+import io
 import os
+import math
+from .jit import njit, NUMBA_AVAILABLE
 
-def extract_mfcc_features(audio_path, n_mfcc=13, n_fft=2048, hop_length=512):
+try:
+    import audioflux
+except ImportError:
+    audioflux = None
+
+# Opt in to audioflux's C/SIMD MFCC with USE_AUDIOFLUX=1; librosa stays the default
+USE_AUDIOFLUX = audioflux is not None and os.environ.get('USE_AUDIOFLUX', '0') == '1'
+
+# Deployments that standardize on one sample rate (e.g. ECOSOUND_SAMPLE_RATE=16000)
+# resample every recording to it, so the per-rate filters are built only once
+TARGET_SAMPLE_RATE = int(os.environ.get('ECOSOUND_SAMPLE_RATE', 0))
+
+def load_audio(audio_path, duration=None):
+    """Decode audio as mono float32 at its native sample rate"""
+    try:
+        # libsndfile reads WAV/FLAC/OGG directly, without audioread or resampling
+        return read_soundfile(audio_path, duration)
+    except RuntimeError:
+        # Formats libsndfile cannot decode (e.g. m4a) go through librosa
+        y, sr = librosa.load(audio_path, sr=None, duration=duration)
+    
+    # Every feature path works on one contiguous float32 buffer
+    return np.ascontiguousarray(y, dtype=np.float32), sr
+
+def load_audio_bytes(audio_blob, duration=None):
+    """Decode an in-memory audio file as mono float32 at its native sample rate"""
+    try:
+        # libsndfile decodes straight from memory, no temporary file needed
+        return read_soundfile(io.BytesIO(audio_blob), duration)
+    except RuntimeError:
+        pass
+    
+    # audioread only opens real files, so other formats still go through disk
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
+        temp_file.write(audio_blob)
+        temp_path = temp_file.name
+    
+    try:
+        return load_audio(temp_path, duration)
+    finally:
+        os.unlink(temp_path)
+
+def read_soundfile(source, duration=None):
+    """Decode a path or file-like object with libsndfile, downmixed to contiguous mono float32"""
+    with soundfile.SoundFile(source) as audio_file:
+        sr = audio_file.samplerate
+        frames = -1 if duration is None else int(duration * sr)
+        y = audio_file.read(frames=frames, dtype='float32', always_2d=True)
+    
+    # Downmix to mono the way librosa.load does
+    y = y.mean(axis=1) if y.shape[1] > 1 else y[:, 0]
+    return np.ascontiguousarray(y, dtype=np.float32), sr
+
+def resample_to_target(y, sr):
+    """Resample to TARGET_SAMPLE_RATE when one is configured"""
+    if not TARGET_SAMPLE_RATE or sr == TARGET_SAMPLE_RATE:
+        return y, sr
+    
+    divisor = math.gcd(int(sr), TARGET_SAMPLE_RATE)
+    y = scipy.signal.resample_poly(y, TARGET_SAMPLE_RATE // divisor, int(sr) // divisor)
+    return np.ascontiguousarray(y, dtype=np.float32), TARGET_SAMPLE_RATE
+
+def extract_mfcc_features(audio_path, n_mfcc=13, n_fft=2048, hop_length=512, y=None, sr=None):
     """
     Extract MFCC features from audio file for privacy-preserving analysis
     
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file (ignored when y and sr are given)
         n_mfcc: Number of MFCC coefficients to extract
         n_fft: FFT window size
         hop_length: Hop length for STFT
+        y: Already decoded audio signal, skips loading the file
+        sr: Sample rate of y
     
     Returns:
         Dictionary containing MFCC features and metadata
     """
     try:
-        # Load audio file
-        y, sr = librosa.load(audio_path, sr=None)
+        # Load audio file unless the caller already has the signal
+        if y is None or sr is None:
+            y, sr = load_audio(audio_path)
+        else:
+            y = np.ascontiguousarray(y, dtype=np.float32)
+        
+        y, sr = resample_to_target(y, sr)
+        
+        # One magnitude spectrogram shared by the MFCC and spectral features
+        S = compute_spectrogram(y, n_fft=n_fft, hop_length=hop_length)
         
         # Extract MFCC features
-        mfccs = librosa.feature.mfcc(
-            y=y, 
-            sr=sr, 
-            n_mfcc=n_mfcc,
-            n_fft=n_fft,
-            hop_length=hop_length
-        )
-        
-        # Calculate statistical features from MFCCs
+        mfccs = compute_mfcc(y, sr, n_mfcc=n_mfcc, n_fft=n_fft, hop_length=hop_length, S=S)
+        
+        # Statistical features from MFCCs, kept as float32 arrays for the models
+        # (the orjson response encoder serializes them natively)
         mfcc_stats = {
-            'mfcc_mean': np.mean(mfccs, axis=1).tolist(),
-            'mfcc_std': np.std(mfccs, axis=1).tolist(),
-            'mfcc_delta': np.mean(librosa.feature.delta(mfccs), axis=1).tolist()
+            'mfcc_mean': np.mean(mfccs, axis=1),
+            'mfcc_std': np.std(mfccs, axis=1),
+            'mfcc_delta': np.mean(librosa.feature.delta(mfccs), axis=1)
         }
         
-        # Extract additional spectral features
-        spectral_features = extract_spectral_features(y, sr)
+        # Extract additional spectral features (these use librosa's default STFT size)
+        shared = (n_fft, hop_length) == (2048, 512)
+        spectral_features = extract_spectral_features(y, sr, S=S if shared else None)
         
         # Extract temporal features
         temporal_features = extract_temporal_features(y, sr)
@@ -63,23 +138,61 @@ def extract_mfcc_features(audio_path, n_mfcc=13, n_fft=2048, hop_length=512):
         print(f"Feature extraction error: {e}")
         return None
 
-def extract_spectral_features(y, sr):
-    """Extract spectral features from audio signal"""
+def compute_spectrogram(y, n_fft=2048, hop_length=512):
+    """Magnitude STFT of a signal, computed once and reused across features"""
+    return np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length, dtype=np.complex64))
+
+def compute_mfcc(y, sr, n_mfcc=13, n_fft=2048, hop_length=512, S=None):
+    """MFCC matrix of shape (n_mfcc, frames), using audioflux when enabled"""
+    # audioflux only supports power-of-two FFT sizes
+    if USE_AUDIOFLUX and n_fft & (n_fft - 1) == 0:
+        try:
+            mfccs, _ = audioflux.mfcc(
+                np.ascontiguousarray(y, dtype=np.float32),
+                cc_num=n_mfcc,
+                radix2_exp=n_fft.bit_length() - 1,
+                samplate=sr,
+                slide_length=hop_length
+            )
+            return mfccs
+        except Exception as e:
+            print(f"audioflux MFCC error: {e}, using librosa")
+    
+    if S is None:
+        S = compute_spectrogram(y, n_fft=n_fft, hop_length=hop_length)
+    
+    # Mel power spectrogram from the STFT magnitude with a cached filterbank
+    mel = mel_filterbank(sr, 2 * (S.shape[0] - 1)) @ (S * S)
+    
+    # Same log scaling and orthonormal DCT-II as librosa.feature.mfcc
+    log_mel = librosa.power_to_db(mel)
+    return scipy.fft.dct(log_mel, axis=0, type=2, norm='ortho', workers=-1)[:n_mfcc]
+
+@lru_cache(maxsize=16)
+def mel_filterbank(sr, n_fft, n_mels=128):
+    """Mel filter matrix of shape (n_mels, 1 + n_fft // 2), built once per configuration"""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+def extract_spectral_features(y, sr, S=None):
+    """Extract spectral features from audio signal, reusing a magnitude spectrogram if given"""
     try:
+        if S is None:
+            S = compute_spectrogram(y)
+        
         # Spectral centroid
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
         
         # Spectral rolloff
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)[0]
         
         # Spectral bandwidth
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[0]
         
         # Zero crossing rate
         zcr = librosa.feature.zero_crossing_rate(y)[0]
         
-        # Chroma features
-        chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+        # Chroma features (power spectrogram)
+        chroma = librosa.feature.chroma_stft(S=S**2, sr=sr)
         
         return {
             'spectral_centroid_mean': float(np.mean(spectral_centroids)),
@@ -90,67 +203,158 @@ def extract_spectral_features(y, sr):
             'spectral_bandwidth_std': float(np.std(spectral_bandwidth)),
             'zcr_mean': float(np.mean(zcr)),
             'zcr_std': float(np.std(zcr)),
-            'chroma_mean': np.mean(chroma, axis=1).tolist(),
-            'chroma_std': np.std(chroma, axis=1).tolist()
+            'chroma_mean': np.mean(chroma, axis=1),
+            'chroma_std': np.std(chroma, axis=1)
         }
         
     except Exception as e:
         print(f"Spectral feature extraction error: {e}")
         return {}
 
-def extract_temporal_features(y, sr):
-    """Extract temporal features from audio signal"""
+# Temporal features computed by default; add 'tempo' to run the beat tracker
+DEFAULT_TEMPORAL_FEATURES = frozenset({'rms', 'onsets'})
+
+def extract_temporal_features(y, sr, features=DEFAULT_TEMPORAL_FEATURES):
+    """Extract temporal features from audio signal, limited to the requested groups"""
     try:
+        temporal = {}
+        
         # RMS energy
-        rms = librosa.feature.rms(y=y)[0]
+        if 'rms' in features:
+            rms = librosa.feature.rms(y=y)[0]
+            temporal['rms_mean'] = float(np.mean(rms))
+            temporal['rms_std'] = float(np.std(rms))
+        
+        # One onset-strength envelope shared by beat tracking and onset detection
+        if 'tempo' in features or 'onsets' in features:
+            onset_envelope = librosa.onset.onset_strength(y=y, sr=sr)
         
         # Tempo estimation
-        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+        if 'tempo' in features:
+            tempo, beats = librosa.beat.beat_track(onset_envelope=onset_envelope, sr=sr)
+            temporal['tempo'] = float(tempo) if tempo else 0.0
         
         # Onset detection
-        onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
-        onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+        if 'onsets' in features:
+            onset_frames = librosa.onset.onset_detect(onset_envelope=onset_envelope, sr=sr)
+            onset_times = librosa.frames_to_time(onset_frames, sr=sr)
+            temporal['onset_rate'] = len(onset_times) / (len(y) / sr)  # onsets per second
         
-        return {
-            'rms_mean': float(np.mean(rms)),
-            'rms_std': float(np.std(rms)),
-            'tempo': float(tempo) if tempo else 0.0,
-            'onset_rate': len(onset_times) / (len(y) / sr),  # onsets per second
-            'energy_entropy': calculate_energy_entropy(y),
-            'silence_ratio': calculate_silence_ratio(y)
-        }
+        # Energy entropy and silence ratio from a single pass over the frames
+        temporal['energy_entropy'], temporal['silence_ratio'] = energy_stats(y)
+        
+        return temporal
         
     except Exception as e:
         print(f"Temporal feature extraction error: {e}")
         return {}
 
-def calculate_energy_entropy(signal, frame_length=2048):
+def frame_energies(signal, frame_length=2048):
+    """Sum of squares of each half-overlapping frame, in one fused pass, accumulated in float64"""
+    frames = librosa.util.frame(signal, frame_length=frame_length, hop_length=frame_length//2)
+    return np.einsum('ij,ij->j', frames, frames, dtype=np.float64)
+
+@njit(cache=True, fastmath=True)
+def _energy_stats_nb(signal, frame_length, hop_length, silence_threshold):
+    """Energy entropy (bits) and silent-frame ratio of a signal in a single scan"""
+    if signal.shape[0] < frame_length:
+        return 0.0, 0.0
+    
+    n_frames = 1 + (signal.shape[0] - frame_length) // hop_length
+    energies = np.empty(n_frames)
+    total = 0.0
+    silent = 0
+    
+    # Overlapping frames share hop-sized blocks, so each sample is squared once
+    blocks_per_frame = frame_length // hop_length
+    if blocks_per_frame * hop_length != frame_length:
+        blocks_per_frame = 0
+    
+    n_blocks = n_frames + blocks_per_frame - 1 if blocks_per_frame else 0
+    block_energies = np.empty(n_blocks)
+    for b in range(n_blocks):
+        start = b * hop_length
+        energy = 0.0
+        for j in range(start, start + hop_length):
+            sample = np.float64(signal[j])
+            energy += sample * sample
+        block_energies[b] = energy
+    
+    for i in range(n_frames):
+        energy = 0.0
+        if blocks_per_frame:
+            for b in range(i, i + blocks_per_frame):
+                energy += block_energies[b]
+        else:
+            start = i * hop_length
+            for j in range(start, start + frame_length):
+                sample = np.float64(signal[j])
+                energy += sample * sample
+        
+        energies[i] = energy
+        total += energy
+        if np.sqrt(energy / frame_length) < silence_threshold:
+            silent += 1
+    
+    # Entropy of the normalized energies, skipping empty frames (0 log 0 = 0)
+    entropy = 0.0
+    if total > 0:
+        for i in range(n_frames):
+            probability = energies[i] / total
+            if probability > 0:
+                entropy -= probability * np.log2(probability)
+    
+    return entropy, silent / n_frames
+
+# Compile the kernel at import instead of on the first request
+_energy_stats_nb(np.zeros(1, dtype=np.float32), 2048, 1024, 0.01)
+
+def energy_stats(signal, frame_length=2048, threshold=0.01):
+    """Energy entropy and silence ratio of half-overlapping frames"""
+    if NUMBA_AVAILABLE:
+        entropy, silence_ratio = _energy_stats_nb(signal, frame_length, frame_length // 2, threshold)
+        return float(entropy), float(silence_ratio)
+    
+    # Without numba the per-sample loop would run in Python; share NumPy frame energies instead
+    try:
+        energies = frame_energies(signal, frame_length)
+    except Exception:
+        return 0.0, 0.0
+    
+    return (
+        calculate_energy_entropy(signal, frame_length, energies=energies),
+        calculate_silence_ratio(signal, threshold, energies=energies)
+    )
+
+def calculate_energy_entropy(signal, frame_length=2048, energies=None):
     """Calculate energy entropy of audio signal"""
     try:
-        # Frame the signal
-        frames = librosa.util.frame(signal, frame_length=frame_length, hop_length=frame_length//2)
-        
         # Calculate energy for each frame
-        energies = np.sum(frames**2, axis=0)
-        energies = energies / np.sum(energies)  # Normalize
+        if energies is None:
+            energies = frame_energies(signal, frame_length)
         
-        # Calculate entropy
-        energies = energies[energies > 0]  # Remove zeros
-        entropy = -np.sum(energies * np.log2(energies))
+        total = np.sum(energies)
+        if total <= 0:
+            return 0.0
+        
+        # Calculate entropy of the normalized energies (xlogy treats 0 log 0 as 0)
+        probabilities = energies / total
+        entropy = -np.sum(scipy.special.xlogy(probabilities, probabilities)) / np.log(2)
         
         return float(entropy)
         
     except:
         return 0.0
 
-def calculate_silence_ratio(signal, threshold=0.01):
+def calculate_silence_ratio(signal, threshold=0.01, energies=None):
     """Calculate ratio of silent frames in audio signal"""
     try:
         frame_length = 2048
-        frames = librosa.util.frame(signal, frame_length=frame_length, hop_length=frame_length//2)
+        if energies is None:
+            energies = frame_energies(signal, frame_length)
         
         # Calculate RMS for each frame
-        frame_rms = np.sqrt(np.mean(frames**2, axis=0))
+        frame_rms = np.sqrt(energies / frame_length)
         
         # Count silent frames
         silent_frames = np.sum(frame_rms < threshold)
@@ -161,64 +365,162 @@ def calculate_silence_ratio(signal, threshold=0.01):
     except:
         return 0.0
 
+# Recordings longer than this many seconds are streamed for noise measurement
+STREAMING_MIN_SECONDS = 600
+
+def recording_duration(audio_path):
+    """Duration in seconds from the file header, or 0.0 if libsndfile cannot read it"""
+    try:
+        return soundfile.info(audio_path).duration
+    except RuntimeError:
+        return 0.0
+
+def stream_noise_levels(audio_path, block_seconds=60):
+    """Leq, RMS, peak and Welch PSD of a long recording, read in constant memory"""
+    with soundfile.SoundFile(audio_path) as audio_file:
+        sr = audio_file.samplerate
+        sos = a_weighting_sos_squared(sr)
+        zi = np.zeros((sos.shape[0], 2))
+        
+        # Whole Welch hops per block, so segments tile each block as they tile the file
+        blocksize = max(2048, block_seconds * sr // 1024 * 1024)
+        
+        sum_squares = 0.0
+        weighted_sum_squares = 0.0
+        n_samples = 0
+        peak = 0.0
+        psd_sum = 0.0
+        n_segments = 0
+        f = None
+        carry = np.zeros(0, dtype=np.float32)  # Samples not yet covered by a Welch segment start
+        
+        for block in audio_file.blocks(blocksize=blocksize, dtype='float32', always_2d=True):
+            block = np.ascontiguousarray(block.mean(axis=1) if block.shape[1] > 1 else block[:, 0])
+            
+            sum_squares += float(np.dot(block, block))
+            peak = max(peak, float(np.max(np.abs(block))))
+            n_samples += block.size
+            
+            # Forward A-weighting with the squared response, carrying filter state across blocks
+            weighted, zi = scipy.signal.sosfilt(sos, block, zi=zi)
+            weighted_sum_squares += float(np.dot(weighted, weighted))
+            
+            # Welch averages segment periodograms, so block PSDs combine by segment count.
+            # Prepending the samples left over from the previous block keeps the
+            # segments that span block boundaries, matching a whole-file Welch
+            spectrum_input = np.concatenate([carry, block])
+            segments = 0
+            if spectrum_input.size >= 2048:
+                segments = 1 + (spectrum_input.size - 2048) // 1024
+                f, psd = scipy.signal.welch(spectrum_input, sr, nperseg=2048, noverlap=1024)
+                psd_sum = psd_sum + psd * segments
+                n_segments += segments
+            carry = spectrum_input[segments * 1024:].copy()
+    
+    if n_segments == 0:
+        raise ValueError('Recording too short for a 2048-sample Welch segment')
+    
+    rms = np.sqrt(sum_squares / n_samples)
+    leq = calculate_leq(None, rms=np.sqrt(weighted_sum_squares / n_samples))
+    return leq, rms, peak, f, psd_sum / n_segments
+
 def extract_noise_level_features(audio_path):
     """Extract features specifically for noise level estimation"""
     try:
-        y, sr = librosa.load(audio_path, sr=None)
-        
-        # A-weighting filter for perceptual noise measurement
-        y_weighted = apply_a_weighting(y, sr)
-        
-        # Calculate equivalent sound level (Leq)
-        leq = calculate_leq(y_weighted)
-        
-        # Statistical measures
-        rms = np.sqrt(np.mean(y**2))
-        peak = np.max(np.abs(y))
+        if recording_duration(audio_path) > STREAMING_MIN_SECONDS:
+            # Long recordings are measured block by block instead of loaded whole
+            leq, rms, peak, f, psd = stream_noise_levels(audio_path)
+        else:
+            y, sr = resample_to_target(*load_audio(audio_path))
+            
+            # A-weighting filter for perceptual noise measurement
+            y_weighted = apply_a_weighting(y, sr, streaming=True)
+            
+            # Calculate equivalent sound level (Leq)
+            leq = calculate_leq(y_weighted)
+            
+            # Statistical measures
+            rms = np.sqrt(np.mean(y**2))
+            peak = np.max(np.abs(y))
+            
+            # Frequency analysis
+            f, psd = scipy.signal.welch(y, sr, nperseg=2048, noverlap=1024)
         
-        # Frequency analysis
-        f, psd = scipy.signal.welch(y, sr, nperseg=2048)
+        # Dominant frequency; its bin also holds the peak power for the spread mask
+        peak_bin = np.argmax(psd)
+        dominant_freq = f[peak_bin]
         
-        # Dominant frequency
-        dominant_freq = f[np.argmax(psd)]
+        # Welch frequencies are sorted, so band edges are split indices into psd
+        low_end, mid_end = np.searchsorted(f, [500, 2000])
         
         return {
             'leq_db': leq,
             'rms': float(rms),
             'peak': float(peak),
             'dominant_frequency': float(dominant_freq),
-            'frequency_spread': float(np.std(f[psd > np.max(psd) * 0.1])),
-            'low_freq_energy': float(np.sum(psd[f < 500])),
-            'mid_freq_energy': float(np.sum(psd[(f >= 500) & (f < 2000)])),
-            'high_freq_energy': float(np.sum(psd[f >= 2000]))
+            'frequency_spread': float(np.std(f, where=psd > psd[peak_bin] * 0.1)),
+            'low_freq_energy': float(np.sum(psd[:low_end])),
+            'mid_freq_energy': float(np.sum(psd[low_end:mid_end])),
+            'high_freq_energy': float(np.sum(psd[mid_end:]))
         }
         
     except Exception as e:
         print(f"Noise level feature extraction error: {e}")
         return {}
 
-def apply_a_weighting(signal, sr):
-    """Apply A-weighting filter to audio signal for perceptual noise measurement"""
+def apply_a_weighting(signal, sr, streaming=False):
+    """
+    Apply A-weighting filter to audio signal for perceptual noise measurement
+    
+    With streaming=True the sections run twice in one forward pass instead of
+    forward and backward. The magnitude response is the same |H|^2 as the
+    zero-phase pass, so levels match; only the phase differs, and the output
+    can be produced block by block.
+    """
     try:
         # A-weighting filter coefficients (simplified)
         # In production, use proper A-weighting filter implementation
-        nyquist = sr / 2
+        if streaming:
+            return scipy.signal.sosfilt(a_weighting_sos_squared(sr), signal)
         
-        # High-pass filter to approximate A-weighting
-        from scipy.signal import butter, filtfilt
-        b, a = butter(2, 500 / nyquist, btype='high')
-        weighted_signal = filtfilt(b, a, signal)
+        weighted_signal = scipy.signal.sosfiltfilt(a_weighting_sos(sr), signal)
         
         return weighted_signal
         
     except:
         return signal  # Return original if filtering fails
 
-def calculate_leq(signal, reference_pressure=20e-6):
-    """Calculate equivalent sound level (Leq) in dB"""
+def apply_a_weighting_blocks(blocks, sr):
+    """A-weight consecutive blocks of one signal, carrying filter state between them"""
+    sos = a_weighting_sos_squared(sr)
+    zi = np.zeros((sos.shape[0], 2))
+    for block in blocks:
+        weighted, zi = scipy.signal.sosfilt(sos, block, zi=zi)
+        yield weighted
+
+@lru_cache(maxsize=8)
+def a_weighting_sos(sr):
+    """High-pass filter approximating A-weighting, in second-order sections, built once per sample rate"""
+    nyquist = sr / 2
+    return scipy.signal.butter(2, 500 / nyquist, btype='high', output='sos')
+
+@lru_cache(maxsize=8)
+def a_weighting_sos_squared(sr):
+    """The A-weighting sections cascaded twice: one forward pass with the |H|^2 of sosfiltfilt"""
+    sos = a_weighting_sos(sr)
+    return np.concatenate([sos, sos])
+
+# Build the filters for a fixed deployment rate at import, not on the first request
+if TARGET_SAMPLE_RATE:
+    mel_filterbank(TARGET_SAMPLE_RATE, 2048)
+    a_weighting_sos_squared(TARGET_SAMPLE_RATE)
+
+def calculate_leq(signal, reference_pressure=20e-6, rms=None):
+    """Calculate equivalent sound level (Leq) in dB, from the signal or an already known RMS"""
     try:
         # RMS calculation
-        rms = np.sqrt(np.mean(signal**2))
+        if rms is None:
+            rms = np.sqrt(np.mean(signal**2))
         
         # Convert to dB SPL (approximate)
         if rms > 0:
@@ -235,23 +537,40 @@ def calculate_leq(signal, reference_pressure=20e-6):
 def extract_features_from_blob(audio_blob):
     """Extract features from audio blob (for real-time processing)"""
     try:
-        # Save blob to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            temp_file.write(audio_blob)
-            temp_path = temp_file.name
-        
-        try:
-            # Extract features
-            features = extract_mfcc_features(temp_path)
-            return features
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_path)
+        # Decode in memory and hand the signal to the shared extraction core
+        y, sr = load_audio_bytes(audio_blob)
+        return extract_mfcc_features(None, y=y, sr=sr)
             
     except Exception as e:
         print(f"Blob feature extraction error: {e}")
         return None
 
+def extract_features_from_blobs(audio_blobs):
+    """Extract features from several audio blobs in parallel worker processes"""
+    # Imported here: the pool module imports this one
+    from .inference_pool import inference_pool
+    
+    temp_paths = []
+    try:
+        for audio_blob in audio_blobs:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
+                temp_paths.append(temp_file.name)
+                temp_file.write(audio_blob)
+        
+        return inference_pool.extract_features(temp_paths)
+        
+    except Exception as e:
+        print(f"Blob feature extraction error: {e}")
+        return [None] * len(audio_blobs)
+        
+    finally:
+        # Clean up temporary files
+        for temp_path in temp_paths:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
 def normalize_features(features):
     """Normalize feature values for ML model input"""
     try:
@@ -264,20 +583,18 @@ def normalize_features(features):
         if 'mfcc' in features:
             mfcc_data = features['mfcc']
             if 'mfcc_mean' in mfcc_data:
-                # Z-score normalization
-                mean_vals = np.array(mfcc_data['mfcc_mean'])
-                std_vals = np.array(mfcc_data['mfcc_std'])
-                normalized_mfcc = (mean_vals - np.mean(mean_vals)) / (np.std(mean_vals) + 1e-8)
-                normalized['mfcc_normalized'] = normalized_mfcc.tolist()
+                # Z-score normalization (no copy when the means are already an array)
+                mean_vals = np.asarray(mfcc_data['mfcc_mean'], dtype=np.float32)
+                normalized['mfcc_normalized'] = (mean_vals - mean_vals.mean()) / (mean_vals.std() + 1e-8)
         
         # Normalize spectral features
         if 'spectral' in features:
             spectral_data = features['spectral']
-            normalized['spectral_normalized'] = {}
-            for key, value in spectral_data.items():
-                if isinstance(value, (int, float)):
-                    # Min-max normalization for spectral features
-                    normalized['spectral_normalized'][key] = max(0, min(1, value))
+            keys = [key for key, value in spectral_data.items() if isinstance(value, (int, float))]
+            
+            # Min-max normalization for spectral features, clipped in one call
+            values = np.clip([spectral_data[key] for key in keys], 0, 1).tolist()
+            normalized['spectral_normalized'] = dict(zip(keys, values))
         
         return {**features, **normalized}
         
@@ -292,8 +609,8 @@ def validate_audio_file(file_path):
         if not os.path.exists(file_path):
             return False, "File not found"
         
-        # Try to load with librosa
-        y, sr = librosa.load(file_path, sr=None, duration=1.0)  # Load first second
+        # Try to decode the first second
+        y, sr = load_audio(file_path, duration=1.0)
         
         # Check basic properties
         if len(y) == 0:
@@ -0,0 +1,73 @@
+# Request batching for ML model inference
+"""
+Collect concurrent inference requests into micro-batches.
+
+Each streamer wraps a batch function (list of inputs -> list of results) so
+that simultaneous HTTP requests share a single model call. When the optional
+service_streamer package is not installed, requests run inline one at a time.
+"""
+import os
+import threading
+
+try:
+    from service_streamer import ThreadedStreamer
+except ImportError:
+    ThreadedStreamer = None
+
+_streamers = []
+
+class InlineStreamer:
+    """Fallback streamer that runs every batch immediately in the caller's thread"""
+    
+    def __init__(self, predict_function):
+        self.predict_function = predict_function
+    
+    def predict(self, batch):
+        """Run the batch function directly"""
+        return self.predict_function(batch)
+
+class ProcessLocalStreamer:
+    """Start the batching worker thread lazily in each process that uses it"""
+    
+    def __init__(self, predict_function, batch_size, max_latency):
+        self.predict_function = predict_function
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._streamer = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def predict(self, batch):
+        """Submit a batch to this process's streamer"""
+        # Threads do not survive fork, so a streamer built before a pre-forking
+        # server (gunicorn --preload) started its workers must be rebuilt
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._streamer = ThreadedStreamer(
+                        self.predict_function, batch_size=self.batch_size, max_latency=self.max_latency
+                    )
+                    self._pid = os.getpid()
+        return self._streamer.predict(batch)
+
+def create_streamer(predict_function, batch_size=32, max_latency=0.05):
+    """Create a micro-batching streamer around a batch predict function"""
+    if ThreadedStreamer is None:
+        streamer = InlineStreamer(predict_function)
+    else:
+        streamer = ProcessLocalStreamer(predict_function, batch_size, max_latency)
+    
+    _streamers.append(streamer)
+    return streamer
+
+def shutdown_streamers():
+    """Stop the worker processes of all created streamers"""
+    while _streamers:
+        streamer = _streamers.pop()
+        streamer = getattr(streamer, '_streamer', streamer)
+        destroy_workers = getattr(streamer, 'destroy_workers', None)
+        if destroy_workers is not None:
+            try:
+                destroy_workers()
+            except Exception as e:
+                print(f"Error stopping streamer: {e}")
@@ -0,0 +1,49 @@
+# Optional response caching
+"""
+Shared Flask-Caching instance with a pass-through fallback.
+
+Read-heavy endpoints whose results change slowly are memoized for a short
+time when flask_caching is installed; without it the decorators do nothing
+and every request is computed afresh.
+
+The default backend is a directory shared by all gunicorn workers on the host,
+so delete_memoized in one worker invalidates the entry for all of them.
+ECOSOUND_CACHE_TYPE picks another backend (e.g. RedisCache together with
+ECOSOUND_CACHE_REDIS_URL for several hosts; SimpleCache is per process).
+"""
+import os
+import tempfile
+
+CACHE_CONFIG = {
+    'CACHE_TYPE': os.environ.get('ECOSOUND_CACHE_TYPE', 'FileSystemCache'),
+    'CACHE_DIR': os.environ.get('ECOSOUND_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ecosound_cache')),
+    'CACHE_DEFAULT_TIMEOUT': 60
+}
+if os.environ.get('ECOSOUND_CACHE_REDIS_URL'):
+    CACHE_CONFIG['CACHE_REDIS_URL'] = os.environ['ECOSOUND_CACHE_REDIS_URL']
+
+try:
+    from flask_caching import Cache
+    cache = Cache(config=CACHE_CONFIG)
+except ImportError:
+    Cache = None
+    
+    class NullCache:
+        """No-op stand-in for flask_caching.Cache"""
+        
+        def init_app(self, app, config=None):
+            pass
+        
+        def cached(self, *args, **kwargs):
+            return lambda func: func
+        
+        def memoize(self, *args, **kwargs):
+            return lambda func: func
+        
+        def delete_memoized(self, *args, **kwargs):
+            pass
+        
+        def clear(self):
+            pass
+    
+    cache = NullCache()
\ No newline at end of file
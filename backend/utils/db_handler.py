@@ -3,13 +3,303 @@ import sqlite3
 import json
 from datetime import datetime, timedelta
 import os
+import math
+import queue
 from contextlib import contextmanager
+from dataclasses import dataclass
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # store structured recording fields as JSON text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib json module
+
+EARTH_RADIUS_KM = 6371.0
+
+# Tables reported by get_database_stats
+STATS_TABLES = ('recordings', 'feedback', 'predictions', 'calibrations')
+
+# Prepared statements kept per pooled connection; enough for every query here
+STATEMENT_CACHE_SIZE = 512
+
+# Rows removed per transaction by clean_old_data
+CLEAN_BATCH_SIZE = 5000
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle of radius_km"""
+    lat_range = radius_km / 111.0  # Approximate degrees per km
+    # A degree of longitude shrinks with cos(latitude); clamp near the poles
+    lng_range = radius_km / (111.0 * max(0.01, math.cos(math.radians(latitude))))
+    return (
+        latitude - lat_range, latitude + lat_range,
+        longitude - lng_range, longitude + lng_range
+    )
+
+@dataclass
+class HistoricalBlock:
+    """Historical noise readings stored column-wise as parallel arrays"""
+    hours: np.ndarray
+    days_of_week: np.ndarray
+    levels: np.ndarray
+    
+    def __len__(self):
+        return len(self.levels)
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build a block from dictionaries with hour, day_of_week and noise_level keys"""
+        return cls(
+            hours=np.array([record['hour'] for record in records], dtype=np.intp),
+            days_of_week=np.array([record['day_of_week'] for record in records], dtype=np.intp),
+            levels=np.array([record['noise_level'] for record in records], dtype=np.float64)
+        )
+
+HISTORICAL_ROW_DTYPE = np.dtype([
+    ('hour', np.int8),
+    ('day_of_week', np.int8),
+    ('noise_level', np.float64)
+])
+
+def _historical_rows(rows):
+    """Yield (hour, day_of_week, noise_level) from (timestamp, noise_level) rows, skipping bad timestamps"""
+    for timestamp, noise_level in rows:
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except:
+            continue
+        yield timestamp.hour, timestamp.weekday(), noise_level
+
+# Column order here is the tuple layout _recording_result unpacks
+RECENT_RECORDINGS_SQL = '''
+    SELECT id, filename, latitude, longitude, timestamp, noise_level,
+        classification, anomaly, created_at
+    FROM recordings 
+    ORDER BY created_at DESC 
+    LIMIT ?
+'''
+
+# Tables, spatial index triggers and indexes, applied as one transaction
+SCHEMA_SQL = '''
+    BEGIN IMMEDIATE;
+
+    -- Audio recordings table
+    CREATE TABLE IF NOT EXISTS recordings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT,
+        latitude REAL,
+        longitude REAL,
+        timestamp TEXT,
+        noise_level REAL,
+        classification BLOB,
+        anomaly BLOB,
+        features BLOB,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        lat3 REAL GENERATED ALWAYS AS (ROUND(latitude, 3)) VIRTUAL,
+        lng3 REAL GENERATED ALWAYS AS (ROUND(longitude, 3)) VIRTUAL
+    );
+
+    -- Spatial index over recording locations, kept in sync by triggers
+    CREATE VIRTUAL TABLE IF NOT EXISTS recordings_rtree USING rtree(
+        id, min_lat, max_lat, min_lng, max_lng
+    );
+
+    CREATE TRIGGER IF NOT EXISTS recordings_rtree_insert
+    AFTER INSERT ON recordings
+    WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+    BEGIN
+        INSERT INTO recordings_rtree
+        VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS recordings_rtree_update
+    AFTER UPDATE OF latitude, longitude ON recordings
+    BEGIN
+        DELETE FROM recordings_rtree WHERE id = OLD.id;
+        INSERT INTO recordings_rtree
+        SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+        WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS recordings_rtree_delete
+    AFTER DELETE ON recordings
+    BEGIN
+        DELETE FROM recordings_rtree WHERE id = OLD.id;
+    END;
+
+    -- Index recordings saved before the spatial index existed
+    INSERT INTO recordings_rtree
+    SELECT id, latitude, latitude, longitude, longitude
+    FROM recordings
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    AND id NOT IN (SELECT id FROM recordings_rtree);
+
+    -- Feedback table
+    CREATE TABLE IF NOT EXISTS feedback (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feedback_text TEXT NOT NULL,
+        latitude REAL,
+        longitude REAL,
+        noise_level REAL,
+        timestamp TEXT,
+        analysis TEXT,
+        status TEXT DEFAULT 'submitted',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Predictions table
+    CREATE TABLE IF NOT EXISTS predictions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        latitude REAL,
+        longitude REAL,
+        predicted_db REAL,
+        confidence REAL,
+        weather_conditions TEXT,
+        timestamp TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- System calibration table
+    CREATE TABLE IF NOT EXISTS calibrations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id TEXT,
+        calibration_offset REAL,
+        reference_level REAL,
+        measured_level REAL,
+        timestamp TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Indexes for the time-window, location and threshold filters
+    CREATE INDEX IF NOT EXISTS idx_recordings_created ON recordings(created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_recordings_geo_time
+    ON recordings(latitude, longitude, created_at);
+    CREATE INDEX IF NOT EXISTS idx_recordings_noise_created
+    ON recordings(noise_level, created_at) WHERE noise_level IS NOT NULL;
+    -- Covers the hotspot query so it groups in grid order without a sort
+    CREATE INDEX IF NOT EXISTS idx_recordings_grid_time
+    ON recordings(lat3, lng3, created_at, noise_level, latitude, longitude)
+    WHERE noise_level IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback(created_at);
+    CREATE INDEX IF NOT EXISTS idx_predictions_created ON predictions(created_at);
+
+    COMMIT;
+'''
+
+INSERT_RECORDING_SQL = '''
+    INSERT INTO recordings 
+    (filename, latitude, longitude, timestamp, noise_level, classification, anomaly, features)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_FEEDBACK_SQL = '''
+    INSERT INTO feedback 
+    (feedback_text, latitude, longitude, noise_level, timestamp, analysis, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_PREDICTION_SQL = '''
+    INSERT INTO predictions 
+    (latitude, longitude, predicted_db, confidence, weather_conditions, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_CALIBRATION_SQL = '''
+    INSERT INTO calibrations 
+    (device_id, calibration_offset, reference_level, measured_level, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+def _dumps_json(value):
+    """Encode JSON text, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(value)
+
+def _loads_json(text):
+    """Decode JSON text, with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def pack_field(value):
+    """Encode a structured recording field, as a msgpack BLOB when available"""
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True)
+    return _dumps_json(value)
+
+def unpack_field(data, default):
+    """Decode a recording field stored as a msgpack BLOB or as legacy JSON text"""
+    if not data:
+        return default
+    if isinstance(data, bytes):
+        if msgpack is None:
+            print("msgpack is not installed, cannot decode stored recording field")
+            return default
+        return msgpack.unpackb(data, raw=False)
+    return _loads_json(data)
+
+def _recording_row(metadata):
+    """Parameters for INSERT_RECORDING_SQL from a metadata dictionary"""
+    return (
+        metadata.get('filename'),
+        metadata.get('latitude'),
+        metadata.get('longitude'),
+        metadata.get('timestamp'),
+        metadata.get('noise_level'),
+        pack_field(metadata.get('classification', [])),
+        pack_field(metadata.get('anomaly', {})),
+        pack_field(metadata.get('features', {}))
+    )
+
+def _feedback_row(feedback_entry):
+    """Parameters for INSERT_FEEDBACK_SQL from a feedback entry"""
+    return (
+        feedback_entry.get('feedback'),
+        feedback_entry.get('latitude'),
+        feedback_entry.get('longitude'),
+        feedback_entry.get('noise_level'),
+        feedback_entry.get('timestamp'),
+        _dumps_json(feedback_entry.get('analysis', {})),  # text, so JSON1 can query it
+        feedback_entry.get('status', 'submitted')
+    )
+
+def _recording_result(cursor, row):
+    """Row factory building the API dictionary for a RECENT_RECORDINGS_SQL row"""
+    id_, filename, latitude, longitude, timestamp, noise_level, classification, anomaly, created_at = row
+    return {
+        'id': id_,
+        'filename': filename,
+        'latitude': latitude,
+        'longitude': longitude,
+        'timestamp': timestamp,
+        'noise_level': noise_level,
+        'classification': unpack_field(classification, []),
+        'anomaly': unpack_field(anomaly, {}),
+        'created_at': created_at
+    }
 
 class DatabaseHandler:
     """Handle database operations for EcoSound Analyzer"""
     
-    def __init__(self, db_path='ecosound.db'):
+    def __init__(self, db_path='ecosound.db', pool_size=8):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._pool_pid = os.getpid()
         self.init_database()
     
     def init_database(self):
@@ -17,75 +307,87 @@ class DatabaseHandler:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Audio recordings table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS recordings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    filename TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    timestamp TEXT,
-                    noise_level REAL,
-                    classification TEXT,
-                    anomaly TEXT,
-                    features TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            # Write-ahead logging persists in the database file, so set it once here
+            if self.db_path != ':memory:':
+                cursor.execute('PRAGMA journal_mode=WAL')
             
-            # Feedback table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS feedback (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    feedback_text TEXT NOT NULL,
-                    latitude REAL,
-                    longitude REAL,
-                    noise_level REAL,
-                    timestamp TEXT,
-                    analysis TEXT,
-                    status TEXT DEFAULT 'submitted',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            # Add the hotspot grid columns to databases created before them (an empty
+            # column set means the table does not exist yet)
+            columns = {row['name'] for row in cursor.execute('PRAGMA table_xinfo(recordings)')}
+            for column, source in (('lat3', 'latitude'), ('lng3', 'longitude')):
+                if columns and column not in columns:
+                    cursor.execute(f'''
+                        ALTER TABLE recordings ADD COLUMN
+                        {column} REAL GENERATED ALWAYS AS (ROUND({source}, 3)) VIRTUAL
+                    ''')
             
-            # Predictions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS predictions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    latitude REAL,
-                    longitude REAL,
-                    predicted_db REAL,
-                    confidence REAL,
-                    weather_conditions TEXT,
-                    timestamp TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            cursor.executescript(SCHEMA_SQL)
             
-            # System calibration table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS calibrations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    device_id TEXT,
-                    calibration_offset REAL,
-                    reference_level REAL,
-                    measured_level REAL,
-                    timestamp TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
+            # Refresh planner statistics, sampling large indexes to keep startup quick
+            cursor.execute('PRAGMA analysis_limit=1000')
+            cursor.execute('ANALYZE')
+    
+    def _connect(self):
+        """Open a new database connection"""
+        # Pooled connections move between request threads. In autocommit mode a
+        # single INSERT is its own transaction; multi-statement writes use transaction()
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+        conn.create_function('haversine_km', 4, haversine_km, deterministic=True)
+        
+        # Per-connection tuning; with WAL, NORMAL sync skips the fsync on every commit
+        if self.db_path != ':memory:':
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')  # 256 MB
+            conn.execute('PRAGMA cache_size=-65536')  # 64 MB
+        return conn
     
     @contextmanager
     def get_connection(self):
-        """Get database connection with context manager"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+        """Borrow a pooled database connection with context manager"""
+        if self._pool_pid != os.getpid():
+            # SQLite connections must not cross a fork; start a fresh pool
+            self._pool = queue.LifoQueue(maxsize=self.pool_size)
+            self._pool_pid = os.getpid()
+        
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
         try:
             yield conn
         finally:
-            conn.close()
+            # Discard anything left uncommitted, as closing the connection used to
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._pool.put_nowait(conn)
+            except (sqlite3.Error, queue.Full):
+                conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection inside a write transaction, committed on success"""
+        with self.get_connection() as conn:
+            # Take the write lock up front rather than upgrading a read lock mid-transaction
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.execute('COMMIT')
+    
+    def close(self):
+        """Close all idle pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def save_audio_metadata(self, metadata):
         """Save audio recording metadata to database"""
@@ -93,100 +395,97 @@ class DatabaseHandler:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO recordings 
-                    (filename, latitude, longitude, timestamp, noise_level, classification, anomaly, features)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    metadata.get('filename'),
-                    metadata.get('latitude'),
-                    metadata.get('longitude'),
-                    metadata.get('timestamp'),
-                    metadata.get('noise_level'),
-                    json.dumps(metadata.get('classification', [])),
-                    json.dumps(metadata.get('anomaly', {})),
-                    json.dumps(metadata.get('features', {}))
-                ))
+                cursor.execute(INSERT_RECORDING_SQL, _recording_row(metadata))
                 
-                conn.commit()
                 return cursor.lastrowid
                 
         except Exception as e:
             print(f"Error saving audio metadata: {e}")
             return None
     
+    def save_audio_metadata_bulk(self, metadatas):
+        """Save many recordings in one transaction, returning how many were saved"""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany(INSERT_RECORDING_SQL, [_recording_row(metadata) for metadata in metadatas])
+                
+                return len(metadatas)
+                
+        except Exception as e:
+            print(f"Error saving audio metadata: {e}")
+            return None
+    
     def save_feedback(self, feedback_entry):
         """Save citizen feedback to database"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO feedback 
-                    (feedback_text, latitude, longitude, noise_level, timestamp, analysis, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    feedback_entry.get('feedback'),
-                    feedback_entry.get('latitude'),
-                    feedback_entry.get('longitude'),
-                    feedback_entry.get('noise_level'),
-                    feedback_entry.get('timestamp'),
-                    json.dumps(feedback_entry.get('analysis', {})),
-                    feedback_entry.get('status', 'submitted')
-                ))
+                cursor.execute(INSERT_FEEDBACK_SQL, _feedback_row(feedback_entry))
                 
-                conn.commit()
                 return cursor.lastrowid
                 
         except Exception as e:
             print(f"Error saving feedback: {e}")
             return None
     
+    def save_feedback_bulk(self, feedback_entries):
+        """Save many feedback entries in one transaction, returning how many were saved"""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany(INSERT_FEEDBACK_SQL, [_feedback_row(entry) for entry in feedback_entries])
+                
+                return len(feedback_entries)
+                
+        except Exception as e:
+            print(f"Error saving feedback: {e}")
+            return None
+    
     def get_feedback_stats(self):
         """Get feedback statistics"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Total feedback count
-                cursor.execute('SELECT COUNT(*) as total FROM feedback')
-                total = cursor.fetchone()['total']
-                
-                # Recent feedback (last 24 hours)
+                # Counts, urgency and average noise level in one scan
                 yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-                cursor.execute('SELECT COUNT(*) as recent FROM feedback WHERE created_at > ?', (yesterday,))
-                recent = cursor.fetchone()['recent']
-                
-                # Average noise level
-                cursor.execute('SELECT AVG(noise_level) as avg_noise FROM feedback WHERE noise_level IS NOT NULL')
-                avg_noise = cursor.fetchone()['avg_noise'] or 0
-                
-                # Top noise sources from analysis
-                cursor.execute('SELECT analysis FROM feedback WHERE analysis IS NOT NULL')
-                analyses = cursor.fetchall()
-                
-                source_counts = {}
-                urgent_count = 0
-                
-                for row in analyses:
-                    try:
-                        analysis = json.loads(row['analysis'])
-                        sources = analysis.get('noise_sources', [])
-                        for source in sources:
-                            source_counts[source] = source_counts.get(source, 0) + 1
-                        
-                        if analysis.get('urgency') == 'high':
-                            urgent_count += 1
-                    except:
-                        continue
-                
-                # Top sources
-                top_sources = sorted(source_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+                cursor.execute('''
+                    SELECT
+                        COUNT(*) AS total,
+                        COALESCE(SUM(created_at > ?), 0) AS recent,
+                        AVG(noise_level) AS avg_noise,
+                        COALESCE(SUM(
+                            CASE WHEN json_valid(analysis) THEN json_extract(analysis, '$.urgency') END = 'high'
+                        ), 0) AS urgent
+                    FROM feedback
+                ''', (yesterday,))
+                row = cursor.fetchone()
+                total = row['total']
+                recent = row['recent']
+                urgent_count = row['urgent']
+                avg_noise = row['avg_noise'] or 0
+                
+                # Top noise sources, counted inside SQLite with JSON1. Ties keep first-seen
+                # order, as Counter.most_common did: the earliest (feedback row, list position)
+                # pair, packed into one integer so both come from the same occurrence
+                cursor.execute('''
+                    SELECT source.value AS source, COUNT(*) AS count
+                    FROM feedback,
+                        json_each(CASE WHEN json_valid(analysis) THEN analysis END, '$.noise_sources') AS source
+                    GROUP BY source.value
+                    ORDER BY count DESC, MIN(feedback.id * 1000000 + source.key)
+                    LIMIT 5
+                ''')
+                top_sources = cursor.fetchall()
                 
                 return {
                     'total': total,
                     'recent': recent,
-                    'sources': [{'source': source, 'count': count} for source, count in top_sources],
+                    'sources': [{'source': row['source'], 'count': row['count']} for row in top_sources],
                     'urgent': urgent_count,
                     'avg_noise': round(avg_noise, 1)
                 }
@@ -201,44 +500,78 @@ class DatabaseHandler:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Simple radius-based filtering (in production, use proper geographic queries)
-                lat_range = radius_km / 111.0  # Approximate degrees per km
-                lng_range = radius_km / (111.0 * abs(latitude) if latitude else 111.0)
-                
                 since_date = (datetime.now() - timedelta(days=days)).isoformat()
                 
-                cursor.execute('''
-                    SELECT timestamp, noise_level, classification 
-                    FROM recordings 
-                    WHERE latitude BETWEEN ? AND ? 
-                    AND longitude BETWEEN ? AND ?
-                    AND created_at > ?
-                    AND noise_level IS NOT NULL
-                    ORDER BY timestamp DESC
-                ''', (
-                    latitude - lat_range, latitude + lat_range,
-                    longitude - lng_range, longitude + lng_range,
-                    since_date
-                ))
+                # Plain tuples, unpacked by position without name lookups
+                cursor.row_factory = None
                 
-                results = []
-                for row in cursor.fetchall():
-                    try:
-                        timestamp = datetime.fromisoformat(row['timestamp'])
-                        results.append({
-                            'timestamp': row['timestamp'],
-                            'noise_level': row['noise_level'],
-                            'hour': timestamp.hour,
-                            'day_of_week': timestamp.weekday(),
-                            'classification': json.loads(row['classification']) if row['classification'] else []
-                        })
-                    except:
-                        continue
-                
-                return results
+                # The R-Tree prunes to the enclosing box; the exact distance check
+                # then runs only on the few candidates it returns
+                cursor.execute('''
+                    SELECT r.timestamp, r.noise_level
+                    FROM recordings_rtree x
+                    JOIN recordings r ON r.id = x.id
+                    WHERE x.max_lat >= ? AND x.min_lat <= ?
+                    AND x.max_lng >= ? AND x.min_lng <= ?
+                    AND r.created_at > ?
+                    AND r.noise_level IS NOT NULL
+                    AND haversine_km(?, ?, r.latitude, r.longitude) <= ?
+                ''', bounding_box(latitude, longitude, radius_km) + (since_date, latitude, longitude, radius_km))
+                
+                # One pass: each timestamp is parsed once straight into a record array
+                parsed = np.fromiter(_historical_rows(cursor), dtype=HISTORICAL_ROW_DTYPE)
+                
+                return HistoricalBlock(
+                    hours=parsed['hour'].astype(np.intp),
+                    days_of_week=parsed['day_of_week'].astype(np.intp),
+                    levels=parsed['noise_level'].astype(np.float64)
+                )
                 
         except Exception as e:
             print(f"Error getting historical data: {e}")
+            return HistoricalBlock.from_records([])
+    
+    def get_area_noise_data(self, latitude, longitude, radius_km=1.0, days=7):
+        """Get recordings within radius_km of a location, nearest first"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                since_date = (datetime.now() - timedelta(days=days)).isoformat()
+                
+                # Plain tuples, unpacked by position without name lookups
+                cursor.row_factory = None
+                
+                # R-Tree prune to the enclosing box, then the exact distance in SQL
+                cursor.execute('''
+                    SELECT * FROM (
+                        SELECT r.id, r.latitude, r.longitude, r.timestamp, r.noise_level,
+                            haversine_km(?, ?, r.latitude, r.longitude) AS distance_km
+                        FROM recordings_rtree x
+                        JOIN recordings r ON r.id = x.id
+                        WHERE x.max_lat >= ? AND x.min_lat <= ?
+                        AND x.max_lng >= ? AND x.min_lng <= ?
+                        AND r.created_at > ?
+                        AND r.noise_level IS NOT NULL
+                    )
+                    WHERE distance_km <= ?
+                    ORDER BY distance_km
+                ''', (latitude, longitude) + bounding_box(latitude, longitude, radius_km) + (since_date, radius_km))
+                
+                return [
+                    {
+                        'id': id_,
+                        'latitude': lat,
+                        'longitude': lng,
+                        'timestamp': timestamp,
+                        'noise_level': noise_level,
+                        'distance_km': round(distance_km, 3)
+                    }
+                    for id_, lat, lng, timestamp, noise_level, distance_km in cursor
+                ]
+                
+        except Exception as e:
+            print(f"Error getting area noise data: {e}")
             return []
     
     def save_prediction(self, prediction_data):
@@ -247,11 +580,7 @@ class DatabaseHandler:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO predictions 
-                    (latitude, longitude, predicted_db, confidence, weather_conditions, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+                cursor.execute(INSERT_PREDICTION_SQL, (
                     prediction_data.get('latitude'),
                     prediction_data.get('longitude'),
                     prediction_data.get('predicted_db'),
@@ -260,7 +589,6 @@ class DatabaseHandler:
                     prediction_data.get('timestamp')
                 ))
                 
-                conn.commit()
                 return cursor.lastrowid
                 
         except Exception as e:
@@ -287,9 +615,7 @@ class DatabaseHandler:
                     AND created_at > ?
                     AND latitude IS NOT NULL 
                     AND longitude IS NOT NULL
-                    GROUP BY 
-                        ROUND(latitude, 3), 
-                        ROUND(longitude, 3)
+                    GROUP BY lat3, lng3
                     HAVING COUNT(*) >= 3
                     ORDER BY avg_db DESC
                     LIMIT 20
@@ -324,11 +650,7 @@ class DatabaseHandler:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    INSERT INTO calibrations 
-                    (device_id, calibration_offset, reference_level, measured_level, timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
+                cursor.execute(INSERT_CALIBRATION_SQL, (
                     calibration_data.get('device_id'),
                     calibration_data.get('calibration_offset'),
                     calibration_data.get('reference_level'),
@@ -336,7 +658,6 @@ class DatabaseHandler:
                     calibration_data.get('timestamp')
                 ))
                 
-                conn.commit()
                 return cursor.lastrowid
                 
         except Exception as e:
@@ -349,60 +670,45 @@ class DatabaseHandler:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                    SELECT * FROM recordings 
-                    ORDER BY created_at DESC 
-                    LIMIT ?
-                ''', (limit,))
-                
-                results = []
-                for row in cursor.fetchall():
-                    results.append({
-                        'id': row['id'],
-                        'filename': row['filename'],
-                        'latitude': row['latitude'],
-                        'longitude': row['longitude'],
-                        'timestamp': row['timestamp'],
-                        'noise_level': row['noise_level'],
-                        'classification': json.loads(row['classification']) if row['classification'] else [],
-                        'anomaly': json.loads(row['anomaly']) if row['anomaly'] else {},
-                        'created_at': row['created_at']
-                    })
+                # Rows come out as finished dictionaries while the cursor is read
+                cursor.row_factory = _recording_result
+                cursor.execute(RECENT_RECORDINGS_SQL, (limit,))
                 
-                return results
+                return list(cursor)
                 
         except Exception as e:
             print(f"Error getting recent recordings: {e}")
             return []
     
+    def _delete_older_than(self, table, cutoff_date, batch_size=CLEAN_BATCH_SIZE):
+        """Delete rows created before cutoff_date in batches, returning how many went"""
+        deleted = 0
+        while True:
+            # One short transaction per batch so ingest can write in between
+            with self.transaction() as conn:
+                cursor = conn.execute(f'''
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table}
+                        WHERE created_at < ?
+                        ORDER BY created_at
+                        LIMIT ?
+                    )
+                ''', (cutoff_date, batch_size))
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return deleted
+    
     def clean_old_data(self, days_to_keep=90):
         """Clean old data from database"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
-                
-                # Clean old recordings
-                cursor.execute('DELETE FROM recordings WHERE created_at < ?', (cutoff_date,))
-                recordings_deleted = cursor.rowcount
-                
-                # Clean old feedback
-                cursor.execute('DELETE FROM feedback WHERE created_at < ?', (cutoff_date,))
-                feedback_deleted = cursor.rowcount
-                
-                # Clean old predictions
-                cursor.execute('DELETE FROM predictions WHERE created_at < ?', (cutoff_date,))
-                predictions_deleted = cursor.rowcount
-                
-                conn.commit()
-                
-                return {
-                    'recordings_deleted': recordings_deleted,
-                    'feedback_deleted': feedback_deleted,
-                    'predictions_deleted': predictions_deleted
-                }
-                
+            cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
+            
+            return {
+                'recordings_deleted': self._delete_older_than('recordings', cutoff_date),
+                'feedback_deleted': self._delete_older_than('feedback', cutoff_date),
+                'predictions_deleted': self._delete_older_than('predictions', cutoff_date)
+            }
+            
         except Exception as e:
             print(f"Error cleaning old data: {e}")
             return {}
@@ -415,10 +721,13 @@ class DatabaseHandler:
                 
                 stats = {}
                 
-                # Table counts
-                for table in ['recordings', 'feedback', 'predictions', 'calibrations']:
-                    cursor.execute(f'SELECT COUNT(*) as count FROM {table}')
-                    stats[f'{table}_count'] = cursor.fetchone()['count']
+                # Table counts in one round trip
+                cursor.execute(
+                    'SELECT ' + ', '.join(
+                        f'(SELECT COUNT(*) FROM {table}) AS {table}_count' for table in STATS_TABLES
+                    )
+                )
+                stats.update(dict(cursor.fetchone()))
                 
                 # Database file size
                 if os.path.exists(self.db_path):
@@ -439,11 +748,20 @@ db_handler = DatabaseHandler()
 def save_audio_metadata(metadata):
     return db_handler.save_audio_metadata(metadata)
 
+def save_audio_metadata_bulk(metadatas):
+    return db_handler.save_audio_metadata_bulk(metadatas)
+
 def save_feedback(feedback_entry):
     return db_handler.save_feedback(feedback_entry)
 
+def save_feedback_bulk(feedback_entries):
+    return db_handler.save_feedback_bulk(feedback_entries)
+
 def get_feedback_stats():
     return db_handler.get_feedback_stats()
 
 def get_historical_data(latitude, longitude, days=30):
-    return db_handler.get_historical_data(latitude, longitude, days)
\ No newline at end of file
+    return db_handler.get_historical_data(latitude, longitude, days)
+
+def get_area_noise_data(latitude, longitude, radius_km=1.0, days=7):
+    return db_handler.get_area_noise_data(latitude, longitude, radius_km, days)
\ No newline at end of file
@@ -0,0 +1,71 @@
+# Process pool for CPU-bound feature extraction
+"""
+Fan audio feature extraction out to worker processes.
+
+MFCC extraction holds the GIL for most of its runtime, so uploads handled by
+threaded workers serialize on it. The pool runs extraction in separate
+processes and hands the feature dictionaries back to the caller, which then
+classifies them together with one batched model call.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .audio_features import extract_mfcc_features
+
+# Workers start from a clean server process rather than forking the caller, whose
+# request, writer and model threads may hold locks at the moment of the fork
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def _worker_run(path):
+    """Extract MFCC features for one file inside a pool worker"""
+    return extract_mfcc_features(path)
+
+class InferencePool:
+    """Process pool created lazily in each process that submits work"""
+    
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self):
+        """Return this process's executor, creating it after a fork"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(_START_METHOD)
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+    
+    def extract_features(self, paths):
+        """Extract features for every path, preserving input order"""
+        if not paths:
+            return []
+        
+        try:
+            return list(self._get_executor().map(_worker_run, paths))
+        except BrokenProcessPool as e:
+            print(f"Inference pool error: {e}")
+            with self._lock:
+                self._pid = None
+            return [_worker_run(path) for path in paths]
+    
+    def shutdown(self):
+        """Stop the worker processes owned by this process"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
+
+inference_pool = InferencePool(int(os.environ.get('ECOSOUND_INFERENCE_WORKERS', 0)) or None)
+
+def shutdown_inference_pool():
+    """Stop the shared inference pool"""
+    inference_pool.shutdown()
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Optional Numba JIT compilation
+"""
+Numba JIT decorator with a pure-Python fallback.
+
+Numeric kernels are decorated with njit so they compile to machine code when
+numba is installed and run unchanged as plain Python when it is not.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
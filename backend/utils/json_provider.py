@@ -0,0 +1,38 @@
+# Fast JSON serialization for Flask responses
+"""
+Flask JSON provider backed by orjson.
+
+orjson encodes in C and natively handles numpy arrays/scalars and datetimes,
+so jsonify() responses skip the stdlib encoder entirely.
+"""
+import orjson
+from flask.json.provider import JSONProvider
+
+class OrjsonProvider(JSONProvider):
+    """Serialize jsonify() responses and parse request bodies with orjson"""
+    
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string"""
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize data from a JSON string or bytes"""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response, handing orjson's bytes straight to the response"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype='application/json'
+        )
+
+def _default(obj):
+    """Fallback for types orjson does not encode natively"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
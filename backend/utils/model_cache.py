@@ -0,0 +1,30 @@
+# On-disk cache for fitted models
+"""
+Memoize model fitting across process restarts.
+
+Fit functions decorated with memory.cache are keyed by a digest of their
+training data, so an identical training set reuses the pickled result
+instead of rebuilding the trees on every cold start.
+"""
+import hashlib
+import os
+import joblib
+
+memory = joblib.Memory(location=os.environ.get('ECOSOUND_MODEL_CACHE', '.model_cache'), verbose=0)
+
+CACHE_BYTES_LIMIT = 512 * 2**20  # Keep the cache under 512 MB
+
+def array_digest(*arrays):
+    """Stable hex digest of the contents, shapes and dtypes of numpy arrays"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def trim_cache():
+    """Evict the least recently used entries beyond the size limit"""
+    try:
+        memory.reduce_size(bytes_limit=CACHE_BYTES_LIMIT)
+    except Exception as e:
+        print(f"Error trimming model cache: {e}")
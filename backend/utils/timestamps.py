@@ -0,0 +1,27 @@
+# Fast timestamp formatting
+"""
+ISO-8601 timestamps for per-request responses.
+
+Formatting a datetime costs a timezone lookup and string building on every
+call; the whole-second part is cached and only the microseconds are
+formatted per call.
+"""
+import time
+from datetime import datetime
+
+# (epoch second, ISO string for that second), replaced as a whole
+_ts_cache = (0, '')
+
+def fast_iso_now():
+    """Local time in ISO-8601 format with microseconds, like datetime.now().isoformat()"""
+    global _ts_cache
+    
+    now = time.time()
+    sec = int(now)
+    
+    cached_sec, cached_str = _ts_cache
+    if sec != cached_sec:
+        cached_str = datetime.fromtimestamp(sec).isoformat()
+        _ts_cache = (sec, cached_str)
+    
+    return f"{cached_str}.{int((now - sec) * 1e6):06d}"
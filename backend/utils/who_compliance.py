@@ -0,0 +1,21 @@
+# WHO noise compliance bands
+"""
+WHO noise limits shared by the audio and prediction routes.
+
+Each route words its responses its own way, one category dict per band; the
+limits and the banding live here so the routes cannot drift apart.
+"""
+import numpy as np
+
+# WHO daytime and critical limits in dB
+WHO_THRESHOLDS = np.array([55, 70])
+
+def who_category(noise_level, categories):
+    """Copy of the category for the band a noise level falls into"""
+    # A level equal to a limit falls into the higher band, matching >=
+    return dict(categories[np.searchsorted(WHO_THRESHOLDS, noise_level, side='right')])
+
+def who_categories(noise_levels, categories):
+    """Copies of the categories for an array of noise levels"""
+    bands = np.searchsorted(WHO_THRESHOLDS, noise_levels, side='right')
+    return [dict(categories[band]) for band in bands.tolist()]
\ No newline at end of file
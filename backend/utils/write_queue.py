@@ -0,0 +1,90 @@
+# Background database writes
+"""
+Persist records on a background thread so requests do not wait on SQLite.
+
+Routes hand finished records to a BackgroundWriter and return immediately;
+a daemon thread in each process drains the queue and retries failed saves.
+Given a batch function, the thread saves whatever has queued up in one call.
+"""
+import os
+import queue
+import threading
+import time
+
+class BackgroundWriter:
+    """Queue records and save them from a per-process daemon thread"""
+    
+    def __init__(self, save_function, maxsize=10000, retries=3, retry_delay=0.1,
+                 batch_function=None, batch_size=500):
+        self.save_function = save_function
+        self.batch_function = batch_function
+        self.batch_size = batch_size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _ensure_worker(self):
+        """Start the writer thread, again in a forked child if needed"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Items queued before a fork belong to the parent
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                    self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+    
+    def submit(self, record):
+        """Queue a record for saving; returns False if it had to be dropped"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            print("Background writer queue full, dropping record")
+            return False
+    
+    def _run(self):
+        """Save queued records until the process exits"""
+        while True:
+            records = [self._queue.get()]
+            
+            # Take whatever else is already waiting, up to one batch
+            if self.batch_function is not None:
+                while len(records) < self.batch_size:
+                    try:
+                        records.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            
+            try:
+                self._save(records)
+            finally:
+                for _ in records:
+                    self._queue.task_done()
+    
+    def _save(self, records):
+        """Save records, retrying while the save function reports failure"""
+        for attempt in range(self.retries):
+            try:
+                if self.batch_function is not None:
+                    result = self.batch_function(records)
+                else:
+                    result = self.save_function(records[0])
+                if result is not None:
+                    return
+            except Exception as e:
+                print(f"Background write error: {e}")
+            time.sleep(self.retry_delay * (attempt + 1))
+        print(f"Background write failed, dropping {len(records)} record(s)")
+    
+    def flush(self, timeout=5.0):
+        """Wait up to timeout seconds for queued records to be saved"""
+        if self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
\ No newline at end of file
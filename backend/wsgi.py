@@ -0,0 +1,9 @@
+# WSGI entry point for production deployment
+# Run with: gunicorn wsgi:app  (settings in gunicorn.conf.py)
+from app import app
+from routes.audio import anomaly_detector
+
+# Models are built at import, so with preload_app they load once in the
+# master and are shared copy-on-write with the forked workers. The anomaly
+# feature history moves to shared memory so all workers feed one buffer.
+anomaly_detector.enable_shared_history()